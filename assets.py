@@ -0,0 +1,207 @@
+# =============================================
+# STATIC ASSET PIPELINE
+# =============================================
+"""Fingerprinted, minified and precompressed static files.
+
+``flask build-assets`` copies everything under ``static/`` (except user
+uploads) into ``static/dist/``, minifying CSS and JS, concatenating the
+``BUNDLES``, naming every file after a hash of its contents
+(``css/article.3f2a9c1e.css``) and writing ``.gz`` (and, with the optional
+``brotli`` package, ``.br``) siblings for compressible types.  The mapping
+from logical to built names goes to ``static/dist/manifest.json``.
+
+When a manifest exists, ``url_for('static', filename=...)`` transparently
+points at the built file, and the static view answers with the best
+precompressed sibling the client accepts plus a one-year ``immutable``
+``Cache-Control``; a changed file gets a new name, so nothing is ever stale.
+Without a manifest (development) URLs are left alone and bundles are
+concatenated on the fly.  Content-addressed uploads (see ``storage``) get the
+same immutable header, since their names change whenever their bytes do.
+
+``rcssmin``/``rjsmin`` are used for minification when installed; otherwise a
+conservative built-in pass strips comments and indentation.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+
+from flask import Response, request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only .gz siblings are written.
+    brotli = None
+
+try:
+    from rcssmin import cssmin
+except ImportError:
+    cssmin = None
+
+try:
+    from rjsmin import jsmin
+except ImportError:
+    jsmin = None
+
+DIST_DIR = 'dist'
+MANIFEST = 'manifest.json'
+SKIP_DIRS = {DIST_DIR, 'uploads'}
+COMPRESSIBLE = {'.css', '.js', '.svg', '.json', '.glb', '.txt'}
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+# Scripts always loaded together, served as one file.
+BUNDLES = {
+    'js/listing.js': ['js/script.js', 'js/load_more.js'],
+}
+
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+_CSS_SPACE_RE = re.compile(r'\s*([{};,>])\s*')
+_JS_LINE_COMMENT_RE = re.compile(r'^\s*//.*$', re.M)
+_CONTENT_ADDRESSED_RE = re.compile(r'^uploads/(variants/)?[0-9a-f]{64}(-\d+)?\.\w+$')
+
+
+# =============================================
+# MINIFICATION
+# =============================================
+def minify_css(source):
+    if cssmin is not None:
+        return cssmin(source)
+    source = _CSS_COMMENT_RE.sub('', source)
+    source = re.sub(r'\s+', ' ', source)
+    source = _CSS_SPACE_RE.sub(r'\1', source)
+    return source.replace(';}', '}').strip()
+
+
+def minify_js(source):
+    if jsmin is not None:
+        return jsmin(source)
+    # Line-preserving on purpose: without a real parser, keeping newlines keeps ASI intact.
+    source = _JS_LINE_COMMENT_RE.sub('', source)
+    return '\n'.join(line.strip() for line in source.splitlines() if line.strip()) + '\n'
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+def concatenate(static_folder, sources):
+    parts = []
+    for source in sources:
+        with open(os.path.join(static_folder, source), encoding='utf-8') as f:
+            parts.append(f.read())
+    # The semicolon guards against a file that ends without one.
+    return '\n;\n'.join(parts)
+
+
+# =============================================
+# BUILD
+# =============================================
+def fingerprinted(logical, data):
+    stem, ext = os.path.splitext(logical)
+    return f'{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}'
+
+
+def _write(dist, built, data):
+    path = os.path.join(dist, built)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    if os.path.splitext(built)[1] in COMPRESSIBLE:
+        with open(path + '.gz', 'wb') as f:
+            f.write(gzip.compress(data, compresslevel=9, mtime=0))
+        if brotli is not None:
+            with open(path + '.br', 'wb') as f:
+                f.write(brotli.compress(data))
+
+
+def build(static_folder, bundles=BUNDLES):
+    """Rebuild ``static/dist`` and its manifest; returns the manifest."""
+    dist = os.path.join(static_folder, DIST_DIR)
+    shutil.rmtree(dist, ignore_errors=True)
+
+    sources = {}
+    for root, dirs, files in os.walk(static_folder):
+        if root == static_folder:
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        for name in files:
+            logical = os.path.relpath(os.path.join(root, name), static_folder).replace(os.sep, '/')
+            with open(os.path.join(root, name), 'rb') as f:
+                sources[logical] = f.read()
+    for logical, parts in bundles.items():
+        sources[logical] = concatenate(static_folder, parts).encode('utf-8')
+
+    manifest = {}
+    for logical, data in sorted(sources.items()):
+        minify = MINIFIERS.get(os.path.splitext(logical)[1])
+        if minify is not None:
+            data = minify(data.decode('utf-8')).encode('utf-8')
+        built = fingerprinted(logical, data)
+        _write(dist, built, data)
+        manifest[logical] = f'{DIST_DIR}/{built}'
+
+    with open(os.path.join(dist, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    return manifest
+
+
+# =============================================
+# SERVING
+# =============================================
+class Assets:
+    def __init__(self, app=None, bundles=BUNDLES):
+        self.bundles = bundles
+        self.manifest = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.static_folder = app.static_folder
+        self.load_manifest()
+        app.url_defaults(self._rewrite_static_url)
+        self._send_static = app.view_functions['static']
+        app.view_functions['static'] = self.static_view
+
+    def load_manifest(self):
+        try:
+            with open(os.path.join(self.static_folder, DIST_DIR, MANIFEST)) as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}
+
+    def build(self):
+        self.manifest = build(self.static_folder, self.bundles)
+        return self.manifest
+
+    def _rewrite_static_url(self, endpoint, values):
+        if endpoint == 'static' and self.manifest:
+            filename = values.get('filename')
+            values['filename'] = self.manifest.get(filename, filename)
+
+    def static_view(self, filename):
+        if filename.startswith(DIST_DIR + '/'):
+            return self._send_built(filename)
+        if filename in self.bundles and not os.path.exists(os.path.join(self.static_folder, filename)):
+            # Development: serve the bundle unbuilt.
+            return Response(concatenate(self.static_folder, self.bundles[filename]),
+                            mimetype='text/javascript')
+        response = self._send_static(filename=filename)
+        if _CONTENT_ADDRESSED_RE.match(filename):
+            response.headers['Cache-Control'] = IMMUTABLE
+        return response
+
+    def _send_built(self, filename):
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        accepted = request.accept_encodings
+        for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if accepted[encoding] and os.path.exists(os.path.join(self.static_folder, filename + suffix)):
+                response = send_from_directory(self.static_folder, filename + suffix, mimetype=mimetype)
+                response.headers['Content-Encoding'] = encoding
+                break
+        else:
+            response = send_from_directory(self.static_folder, filename, mimetype=mimetype)
+        if os.path.splitext(filename)[1] in COMPRESSIBLE:
+            response.vary.add('Accept-Encoding')
+        response.headers['Cache-Control'] = IMMUTABLE
+        return response
@@ -0,0 +1,70 @@
+# =============================================
+# AUTHOR IDENTITY CACHE
+# =============================================
+"""Process-wide cache of the little every page shows about an author.
+
+Article pages, comment threads and discussions render a name and an avatar
+per author, which meant joining ``user`` (and loading every column of it)
+into each of those queries.  ``author_cache.get_many(ids)`` answers from an
+in-process LRU and loads whatever is missing in one query, so a page of 50
+comments costs at most one lookup however many people wrote them.
+
+Templates get two helpers: ``author(user_id)`` for a single record and
+``authors_of(rows)``, which batch-loads the authors of a list of rows (by
+their ``author_id``) and returns ``{user_id: Author}``.
+
+``update_profile`` invalidates the entry it changed.  Other worker processes
+keep serving their copy until ``AUTHOR_CACHE_TTL`` runs out, so a renamed
+user can show under the old name there for that long.
+"""
+import os
+from collections import namedtuple
+
+from cache import TTLCache
+
+Author = namedtuple('Author', ['id', 'username', 'profile_pic', 'profile_pic_variants'])
+
+
+class AuthorCache:
+    def __init__(self, app=None, db=None, user_model=None):
+        self.db = db
+        self.user_model = user_model
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('AUTHOR_CACHE_SIZE', int(os.environ.get('AUTHOR_CACHE_SIZE', 10000)))
+        app.config.setdefault('AUTHOR_CACHE_TTL', 300)
+        self.cache = TTLCache(ttl=app.config['AUTHOR_CACHE_TTL'], maxsize=app.config['AUTHOR_CACHE_SIZE'])
+        app.add_template_global(self.get, 'author')
+        app.add_template_global(self.authors_of)
+
+    def get(self, user_id):
+        return self.get_many([user_id]).get(user_id)
+
+    def get_many(self, user_ids):
+        """``{user_id: Author}`` for the given ids; unknown ids are left out."""
+        found = {}
+        missing = set()
+        for user_id in user_ids:
+            author = self.cache.get(user_id)
+            if author is None:
+                missing.add(user_id)
+            else:
+                found[user_id] = author
+        if missing:
+            User = self.user_model
+            rows = self.db.session.query(User.id, User.username, User.profile_pic, User.profile_pic_variants)\
+                                  .filter(User.id.in_(missing))\
+                                  .all()
+            for row in rows:
+                author = Author(*row)
+                self.cache.set(author.id, author)
+                found[author.id] = author
+        return found
+
+    def authors_of(self, rows, attribute='author_id'):
+        return self.get_many({getattr(row, attribute) for row in rows})
+
+    def invalidate(self, user_id):
+        self.cache.delete(user_id)
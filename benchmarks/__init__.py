@@ -0,0 +1 @@
+"""Benchmarks and synthetic data for measuring Miso's performance."""
@@ -0,0 +1,333 @@
+# =============================================
+# ROUTE BENCHMARK HARNESS
+# =============================================
+"""Time Miso's key routes against a seeded database and report JSON.
+
+    python -m benchmarks.harness bench.db                       # seeds it first if missing
+    python -m benchmarks.harness bench.db --json after.json --compare before.json
+    python -m benchmarks.harness bench.db --mode wsgi --concurrency 16 --routes home,article_view
+
+Every route is driven twice by default.  The ``client`` mode uses Flask's
+test client from a single thread, so it measures the server-side cost of a
+request without any network in the way.  The ``wsgi`` mode starts a real
+threaded WSGI server on a local port and hits it from ``--concurrency``
+keep-alive connections, so locking, connection pooling and caches are
+exercised the way production traffic exercises them.
+
+For each route the report gives p50/p95/p99/mean latency in milliseconds,
+throughput in requests per second, the number of non-2xx responses, and the
+mean number of SQL statements per request (counted by ``query_budget``).
+Requests are generated from a seeded RNG, so two runs against the same
+database send the same traffic.  ``--compare`` prints the change in p95 and SQL statements
+against an earlier report.
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import seed as seeding
+
+SQL_HEADER = 'X-Benchmark-SQL-Statements'
+
+
+# =============================================
+# TRAFFIC
+# =============================================
+class Traffic:
+    """Deterministic requests for each benchmarked route."""
+
+    def __init__(self, bounds, seed_value=0):
+        self.bounds = bounds
+        self.rng = random.Random(seed_value)
+        self._lock = threading.Lock()
+
+    def _pick(self, table):
+        with self._lock:
+            return self.rng.randint(1, self.bounds[table])
+
+    def _word(self):
+        with self._lock:
+            return self.rng.choice(seeding.WORDS)
+
+    # Each returns (method, path, user_id or None for an anonymous request).
+    def home(self):
+        return 'GET', '/', None
+
+    def search(self):
+        return 'GET', f'/search?q={self._word()}', self._pick('user')
+
+    def searchbe(self):
+        return 'GET', f'/searchbe?q={self._word()}', None
+
+    def article_view(self):
+        return 'GET', f"/article/{self._pick('article')}", self._pick('user')
+
+    def like_article(self):
+        return 'POST', f"/article/{self._pick('article')}/like", self._pick('user')
+
+    def view_discussion(self):
+        return 'GET', f"/discussion/{self._pick('discussion')}", self._pick('user')
+
+    def profile(self):
+        return 'GET', '/profile', self._pick('user')
+
+
+ROUTES = ['home', 'search', 'searchbe', 'article_view', 'like_article', 'view_discussion', 'profile']
+
+
+def table_bounds(path):
+    import sqlite3
+    conn = sqlite3.connect(path)
+    bounds = {table: conn.execute(f'SELECT COALESCE(MAX(id), 0) FROM "{table}"').fetchone()[0]
+              for table in ('user', 'article', 'discussion')}
+    conn.close()
+    missing = [table for table, count in bounds.items() if not count]
+    if missing:
+        raise SystemExit(f'{path} has no rows in: {", ".join(missing)}')
+    return bounds
+
+
+# =============================================
+# APPLICATION
+# =============================================
+def load_app(path):
+    """Build the app bound to the benchmark database, with derived data in place."""
+    from flask import request
+    from app import create_app
+    from extensions import db, search_index
+    from models import like_buffer, trending
+    from query_budget import statement_count
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.abspath(path)}'})
+
+    @app.after_request
+    def report_statements(response):
+        if request.headers.get('X-Benchmark'):
+            response.headers[SQL_HEADER] = str(statement_count())
+        return response
+
+    with app.app_context():
+        search_index.create_all()
+        if not db.session.execute(trending.table.select().limit(1)).first():
+            print('Ranking articles for the trending feeds...')
+            trending.rebuild()
+    return app, like_buffer
+
+
+class SessionCookies(dict):
+    """``Cookie`` header logging in a user, signed like Flask's own session cookie on first use."""
+
+    def __init__(self, app):
+        super().__init__()
+        self.serializer = app.session_interface.get_signing_serializer(app)
+        self.name = app.config['SESSION_COOKIE_NAME']
+
+    def __missing__(self, user_id):
+        value = self[user_id] = f'{self.name}={self.serializer.dumps({"user_id": user_id})}'
+        return value
+
+
+# =============================================
+# DRIVERS
+# =============================================
+class ClientDriver:
+    mode = 'client'
+
+    def __init__(self, app):
+        self.app = app
+        # Without its own cookie jar the client sends the Cookie header it is given.
+        self.client = app.test_client(use_cookies=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def send(self, method, path, headers):
+        response = self.client.open(path, method=method, headers=headers)
+        response.close()
+        return response.status_code, int(response.headers.get(SQL_HEADER, 0))
+
+
+class WSGIDriver:
+    mode = 'wsgi'
+
+    def __init__(self, app, host='127.0.0.1'):
+        from werkzeug.serving import WSGIRequestHandler, make_server
+
+        class QuietHandler(WSGIRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_request(self, *args):
+                pass
+
+        self.server = make_server(host, 0, app, threaded=True, request_handler=QuietHandler)
+        self.host, self.port = host, self.server.server_port
+        self._local = threading.local()
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.thread.join()
+
+    def send(self, method, path, headers):
+        # One keep-alive connection per client thread.
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        try:
+            connection.request(method, path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+        except (http.client.HTTPException, OSError):
+            connection.close()
+            self._local.connection = None
+            return 599, 0
+        return response.status, int(response.headers.get(SQL_HEADER, 0))
+
+
+# =============================================
+# MEASUREMENT
+# =============================================
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def bench_route(driver, traffic, route, cookies, requests, warmup, concurrency):
+    make_request = getattr(traffic, route)
+
+    def one():
+        method, path, user_id = make_request()
+        headers = {'X-Benchmark': '1'}
+        if user_id is not None:
+            headers['Cookie'] = cookies[user_id]
+        started = time.perf_counter()
+        status, statements = driver.send(method, path, headers)
+        return (time.perf_counter() - started) * 1000, status, statements
+
+    for _ in range(warmup):
+        one()
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(lambda _: one(), range(requests)))
+    else:
+        samples = [one() for _ in range(requests)]
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for latency, _, _ in samples]
+    return {
+        'requests': requests,
+        'errors': sum(1 for _, status, _ in samples if status >= 300),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(statistics.fmean(latencies), 3),
+        'throughput_rps': round(requests / elapsed, 1),
+        'sql_per_request': round(statistics.fmean(statements for _, _, statements in samples), 2),
+    }
+
+
+def run(path, routes=ROUTES, modes=('client', 'wsgi'), requests=200, warmup=20, concurrency=8, seed_value=0):
+    bounds = table_bounds(path)
+    app, like_buffer = load_app(path)
+    traffic = Traffic(bounds, seed_value)
+    cookies = SessionCookies(app)
+
+    results = {}
+    for mode in modes:
+        driver = ClientDriver(app) if mode == 'client' else WSGIDriver(app)
+        with driver:
+            results[mode] = {}
+            for route in routes:
+                results[mode][route] = bench_route(driver, traffic, route, cookies, requests, warmup,
+                                                   concurrency if mode == 'wsgi' else 1)
+                print(f"{mode:>6} {route:<16} p50 {results[mode][route]['p50_ms']:>8} ms  "
+                      f"p95 {results[mode][route]['p95_ms']:>8} ms  "
+                      f"{results[mode][route]['throughput_rps']:>8} req/s  "
+                      f"{results[mode][route]['sql_per_request']:>5} SQL")
+    with app.app_context():
+        like_buffer.flush()
+
+    return {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'database': {'path': os.path.abspath(path), 'rows': bounds},
+        'settings': {'requests': requests, 'warmup': warmup, 'concurrency': concurrency, 'seed': seed_value},
+        'results': results,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline):
+    """Print the p95 and SQL-per-request change of every route measured in both reports."""
+    print(f"\nChanges against {baseline.get('commit') or 'baseline'}:")
+    for mode, routes in report['results'].items():
+        for route, result in routes.items():
+            before = baseline.get('results', {}).get(mode, {}).get(route)
+            if not before:
+                continue
+            change = (result['p95_ms'] - before['p95_ms']) / max(before['p95_ms'], 1e-3) * 100
+            print(f"{mode:>6} {route:<16} p95 {before['p95_ms']:>8} -> {result['p95_ms']:>8} ms "
+                  f"({change:+.1f}%)  SQL {before['sql_per_request']} -> {result['sql_per_request']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path', help='SQLite database file; seeded with the default volumes if it does not exist')
+    parser.add_argument('--routes', default=','.join(ROUTES), help='comma-separated subset of: ' + ', '.join(ROUTES))
+    parser.add_argument('--mode', choices=['client', 'wsgi', 'both'], default='both')
+    parser.add_argument('--requests', type=int, default=200, help='timed requests per route')
+    parser.add_argument('--warmup', type=int, default=20, help='untimed requests per route first')
+    parser.add_argument('--concurrency', type=int, default=8, help='parallel connections in wsgi mode')
+    parser.add_argument('--seed', type=int, default=0, help='RNG seed for the generated traffic')
+    parser.add_argument('--json', help='write the report to this file')
+    parser.add_argument('--compare', help='earlier report to compare against')
+    args = parser.parse_args(argv)
+
+    routes = [route.strip() for route in args.routes.split(',') if route.strip()]
+    unknown = set(routes) - set(ROUTES)
+    if unknown:
+        parser.error(f'unknown routes: {", ".join(sorted(unknown))}')
+    if not os.path.exists(args.path):
+        print(f'Seeding {args.path}...')
+        seeding.seed(args.path)
+
+    modes = ('client', 'wsgi') if args.mode == 'both' else (args.mode,)
+    report = run(args.path, routes, modes, args.requests, args.warmup, args.concurrency, args.seed)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
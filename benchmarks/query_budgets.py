@@ -0,0 +1,116 @@
+# =============================================
+# QUERY BUDGET CHECK
+# =============================================
+"""Drive every route that declares a ``@query_budget`` with budgets enforced.
+
+    python -m benchmarks.query_budgets bench.db          # seeds a small database if missing
+
+Each request runs once against the given database with
+``ENFORCE_QUERY_BUDGETS`` on and likes written through, so the flush a
+like triggers counts against the route that triggered it.  The like
+requests toggle back what they change.  Prints the statement count of every
+route against its budget and exits non-zero if any route goes over.
+"""
+import argparse
+import os
+import sys
+
+from benchmarks import seed as seeding
+
+SMALL_COUNTS = {'users': 200, 'articles': 2000, 'comments': 4000, 'likes': 6000, 'discussions': 50,
+                'messages': 500}
+
+
+def requests_to_check(user, username, article, other, discussion):
+    """(endpoint, method, path, logged in, JSON body) for every budgeted route."""
+    return [
+        ('search.search', 'GET', '/search?q=the', True, None),
+        ('search.search_be', 'GET', '/searchbe?q=the', False, None),
+        ('search.search_profiles', 'GET', f'/search/profiles?q={username[:3]}', True, None),
+        ('discussions.discussions', 'GET', '/discussions', True, None),
+        ('discussions.view_discussion', 'GET', f'/discussion/{discussion}', True, None),
+        ('discussions.discussion_messages', 'GET', f'/discussion/{discussion}/messages', True, None),
+        ('discussions.discussion_history', 'GET', f'/discussion/{discussion}/history', True, None),
+        ('profiles.profile', 'GET', '/profile', True, None),
+        ('profiles.view_profile', 'GET', f'/profile/{username}', True, None),
+        ('articles.article_view', 'GET', f'/article/{article}', True, None),
+        ('articles.article_be', 'GET', f'/article_be/{article}', False, None),
+        # Liking twice toggles the article back; the batches like, then swap, then restore.
+        ('articles.like_article', 'POST', f'/article/{article}/like', True, None),
+        ('articles.like_article', 'POST', f'/article/{article}/like', True, None),
+        ('articles.set_likes', 'POST', '/api/likes', True, {'likes': [{'article_id': article, 'liked': True}]}),
+        ('articles.set_likes', 'POST', '/api/likes', True, {'likes': [{'article_id': article, 'liked': False},
+                                                                      {'article_id': other, 'liked': True}]}),
+        ('articles.set_likes', 'POST', '/api/likes', True, {'likes': [{'article_id': other, 'liked': False}]}),
+    ]
+
+
+def run(path):
+    """Returns ``[(endpoint, method, path, statements or None, budget, error or None)]``."""
+    from app import create_app
+    from extensions import db, search_index
+    from models import Article, Discussion, Like, User
+    from query_budget import statement_count
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.abspath(path)}',
+                      'ENFORCE_QUERY_BUDGETS': True, 'LIKE_BUFFER_EAGER': True,
+                      'PROPAGATE_EXCEPTIONS': True})
+    counts = []
+
+    @app.after_request
+    def remember_count(response):
+        # Registered last, so it runs before the budget check can raise.
+        counts.append(statement_count())
+        return response
+
+    with app.app_context():
+        # Also settles whether FTS is available, which a cold request would otherwise pay for.
+        search_index.create_all()
+        user = db.session.query(User.id, User.username).order_by(User.id).first()
+        # Articles this user has not liked, so the like requests are real writes.
+        liked = db.select(Like.article_id).where(Like.user_id == user.id)
+        article, other = db.session.scalars(db.select(Article.id).where(Article.id.not_in(liked))
+                                              .order_by(Article.id).limit(2)).all()
+        discussion = db.session.scalar(db.select(Discussion.id).order_by(Discussion.id))
+        budgets = {endpoint: getattr(view, 'query_budget', None) for endpoint, view in app.view_functions.items()}
+
+    client = app.test_client()
+    results = []
+    for endpoint, method, url, logged_in, body in requests_to_check(user.id, user.username, article, other,
+                                                                    discussion):
+        with client.session_transaction() as session:
+            if logged_in:
+                session['user_id'] = user.id
+            else:
+                session.pop('user_id', None)
+        counts.clear()
+        error = None
+        try:
+            response = client.open(url, method=method, json=body)
+            if response.status_code >= 400:
+                error = f'HTTP {response.status_code}'
+        except AssertionError as exc:
+            error = str(exc).splitlines()[0]
+        results.append((endpoint, method, url, counts[0] if counts else None, budgets[endpoint], error))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path', help='SQLite database file; seeded with a small data set if it does not exist')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.path):
+        print(f'Seeding {args.path}...')
+        seeding.seed(args.path, SMALL_COUNTS)
+
+    failed = 0
+    for endpoint, method, url, statements, budget, error in run(args.path):
+        failed += error is not None
+        print(f"{'FAIL' if error else 'ok':<4} {method:<4} {url:<40} {statements if statements is not None else '?':>3}"
+              f" / {budget} SQL  {error or ''}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+# =============================================
+# QUERY PLANS BEFORE/AFTER INDEXING
+# =============================================
+"""Show how the model indexes change the plans of Miso's hot queries.
+
+    python -m benchmarks.query_plans bench.db            # seeds ~1M rows if missing
+    python -m benchmarks.query_plans bench.db --json plans.json
+
+Every index declared on the models is dropped, each query is explained and
+timed, then the indexes are rebuilt and the same queries run again.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import time
+
+import sqlalchemy as sa
+
+from benchmarks import seed as seeding
+
+# (name, SQL, parameters) for the queries behind the routes the indexes target.
+QUERIES = [
+    ('profile: articles by author',
+     'SELECT id, title, excerpt FROM article WHERE author_id = ? ORDER BY id DESC', (42,)),
+    ('profile: likes received',
+     'SELECT COUNT("like".id) FROM "like" JOIN article ON "like".article_id = article.id '
+     'WHERE article.author_id = ?', (42,)),
+    ('category_page: newest in category',
+     'SELECT id, title, excerpt FROM article WHERE category = ? ORDER BY id DESC LIMIT 13', ('health',)),
+    ('like_article: existing like',
+     'SELECT id FROM "like" WHERE user_id = ? AND article_id = ?', (42, 4242)),
+    ('article_view: comments',
+     'SELECT id, text, author_id FROM comment WHERE article_id = ?', (4242,)),
+    ('view_discussion: latest messages',
+     'SELECT id, text, author_id FROM discussion_message WHERE discussion_id = ? '
+     'ORDER BY timestamp DESC, id DESC LIMIT 51', (42,)),
+    ('discussions: newest',
+     'SELECT id, title FROM discussion ORDER BY created_at DESC LIMIT 9', ()),
+]
+
+
+def model_indexes():
+    from models import db
+    return [index for table in db.metadata.sorted_tables for index in table.indexes]
+
+
+def measure(conn, repeat):
+    results = []
+    for name, sql, params in QUERIES:
+        plan = [row[-1] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params)]
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            timings.append((time.perf_counter() - started) * 1000)
+        results.append({'query': name, 'plan': plan, 'median_ms': round(statistics.median(timings), 3)})
+    return results
+
+
+def run(path, repeat=5):
+    indexes = model_indexes()
+    engine = sa.create_engine(f'sqlite:///{os.path.abspath(path)}')
+    with engine.begin() as connection:
+        for index in indexes:
+            index.drop(connection, checkfirst=True)
+
+    conn = sqlite3.connect(path)
+    conn.execute('ANALYZE')
+    before = measure(conn, repeat)
+    conn.close()
+
+    with engine.begin() as connection:
+        for index in indexes:
+            index.create(connection, checkfirst=True)
+        connection.exec_driver_sql('ANALYZE')
+    engine.dispose()
+
+    conn = sqlite3.connect(path)
+    after = measure(conn, repeat)
+    conn.close()
+    return [
+        {'query': b['query'], 'before': b, 'after': a, 'speedup': round(b['median_ms'] / max(a['median_ms'], 1e-3), 1)}
+        for b, a in zip(before, after)
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path', help='SQLite database file; seeded with ~1M rows if it does not exist')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per query')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.path):
+        print(f'Seeding {args.path}...')
+        seeding.seed(args.path)
+
+    results = run(args.path, args.repeat)
+    for result in results:
+        print(f"\n{result['query']}  ({result['before']['median_ms']} ms -> "
+              f"{result['after']['median_ms']} ms, x{result['speedup']})")
+        print('  before: ' + '\n          '.join(result['before']['plan']))
+        print('  after:  ' + '\n          '.join(result['after']['plan']))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
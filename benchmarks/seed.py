@@ -0,0 +1,163 @@
+# =============================================
+# SYNTHETIC DATA GENERATOR
+# =============================================
+"""Fill a SQLite database with realistic volumes of Miso data.
+
+    python -m benchmarks.seed bench.db --articles 100000 --likes 500000
+
+The schema comes from the application's models, rows are generated from a
+seeded RNG so two runs with the same arguments produce the same database,
+and inserts go straight through ``sqlite3`` in large batches so a
+million-row database takes well under a minute to build.  Every user's
+password is ``password``.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+import sqlalchemy as sa
+from werkzeug.security import generate_password_hash
+
+DEFAULT_COUNTS = {
+    'users': 10_000,
+    'articles': 100_000,
+    'comments': 300_000,
+    'likes': 500_000,
+    'discussions': 5_000,
+    'messages': 85_000,
+}
+CATEGORIES = ['art', 'culture', 'sport', 'economy', 'technology', 'health', 'entrepreneurship', 'other']
+PASSWORD = 'password'
+BATCH_SIZE = 10_000
+
+WORDS = (
+    'art culture sport economy technology health startup market design music city travel '
+    'food science future history community energy climate policy data model system network '
+    'design paint canvas gallery museum festival tradition language athlete match league '
+    'training growth inflation trade investment founder product launch funding software '
+    'hardware cloud privacy security research wellness sleep nutrition fitness mindset '
+    'story journey idea creative global local modern classic digital human nature ocean '
+    'mountain river garden coffee morning evening weekend season library school family'
+).split()
+
+
+def words(rng, low, high):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+
+def timestamp(rng, now, days=365):
+    moment = now - timedelta(seconds=rng.randrange(days * 86400))
+    return moment.strftime('%Y-%m-%d %H:%M:%S.%f')
+
+
+def create_schema(path):
+    """Create the application's tables (and indexes) in a fresh database at ``path``."""
+    from models import db
+    engine = sa.create_engine(f'sqlite:///{os.path.abspath(path)}')
+    db.metadata.create_all(engine)
+    engine.dispose()
+
+
+def _insert(conn, table, columns, rows):
+    sql = f'INSERT INTO "{table}" ({", ".join(columns)}) VALUES ({", ".join("?" * len(columns))})'
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            conn.executemany(sql, batch)
+            batch.clear()
+    if batch:
+        conn.executemany(sql, batch)
+
+
+def seed(path, counts=None, seed_value=0, content_words=(80, 200)):
+    """Create ``path`` and fill it; returns the number of rows written per table."""
+    counts = dict(DEFAULT_COUNTS, **(counts or {}))
+    rng = random.Random(seed_value)
+    now = datetime(2026, 1, 1)
+    if os.path.exists(path):
+        os.remove(path)
+    create_schema(path)
+
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode = OFF')
+    conn.execute('PRAGMA synchronous = OFF')
+    password = generate_password_hash(PASSWORD)
+    users, articles, discussions = counts['users'], counts['articles'], counts['discussions']
+
+    _insert(conn, 'user', ['id', 'username', 'email', 'password', 'profile_pic'], (
+        (i, f'user{i}', f'user{i}@example.com', password, 'default.jpg')
+        for i in range(1, users + 1)
+    ))
+    _insert(conn, 'article', ['id', 'title', 'content', 'excerpt', 'category', 'date', 'image_url', 'author_id',
+                              'updated_at'], (
+        (i, words(rng, 3, 8).capitalize(), content, content[:300], rng.choice(CATEGORIES),
+         (now - timedelta(days=rng.randrange(365))).strftime('%B %d, %Y'),
+         'default_article.jpg', rng.randint(1, users), timestamp(rng, now))
+        for i in range(1, articles + 1)
+        for content in [words(rng, *content_words)]
+    ))
+    _insert(conn, 'comment', ['text', 'timestamp', 'author_id', 'article_id'], (
+        (words(rng, 5, 30), timestamp(rng, now), rng.randint(1, users), rng.randint(1, articles))
+        for _ in range(counts['comments'])
+    ))
+
+    # Likes are unique per (user, article); draw pairs until we have enough distinct ones.
+    pairs = set()
+    target = min(counts['likes'], users * articles)
+    while len(pairs) < target:
+        pairs.add((rng.randint(1, users), rng.randint(1, articles)))
+    _insert(conn, 'like', ['user_id', 'article_id', 'timestamp'], (
+        (user_id, article_id, timestamp(rng, now)) for user_id, article_id in pairs
+    ))
+
+    _insert(conn, 'discussion', ['id', 'title', 'description', 'profile_pic', 'created_at', 'author_id'], (
+        (i, words(rng, 3, 8).capitalize(), words(rng, 10, 40), 'default_discussion.jpg',
+         timestamp(rng, now), rng.randint(1, users))
+        for i in range(1, discussions + 1)
+    ))
+    _insert(conn, 'discussion_message', ['text', 'timestamp', 'author_id', 'discussion_id'], (
+        (words(rng, 3, 40), timestamp(rng, now), rng.randint(1, users), rng.randint(1, discussions))
+        for _ in range(counts['messages'])
+    ))
+
+    conn.execute(
+        'UPDATE article SET '
+        'like_count = (SELECT COUNT(*) FROM "like" WHERE "like".article_id = article.id), '
+        'comment_count = (SELECT COUNT(*) FROM comment WHERE comment.article_id = article.id)'
+    )
+    conn.execute(
+        'INSERT INTO author_stats (id, article_count, like_count, comment_count) '
+        'SELECT "user".id, COUNT(article.id), COALESCE(SUM(article.like_count), 0), '
+        'COALESCE(SUM(article.comment_count), 0) '
+        'FROM "user" LEFT JOIN article ON article.author_id = "user".id GROUP BY "user".id'
+    )
+    conn.execute(
+        'UPDATE discussion SET message_count = (SELECT COUNT(*) FROM discussion_message '
+        'WHERE discussion_message.discussion_id = discussion.id)'
+    )
+    conn.commit()
+    conn.execute('ANALYZE')
+    conn.close()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path', help='SQLite database file to (re)create')
+    for name, default in DEFAULT_COUNTS.items():
+        parser.add_argument(f'--{name}', type=int, default=default)
+    parser.add_argument('--seed', type=int, default=0, help='RNG seed')
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    counts = seed(args.path, {name: getattr(args, name) for name in DEFAULT_COUNTS}, args.seed)
+    print(f'Seeded {sum(counts.values()):,} rows into {args.path} '
+          f'in {time.perf_counter() - started:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
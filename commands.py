@@ -0,0 +1,83 @@
+# =============================================
+# CLI COMMANDS
+# =============================================
+"""Maintenance commands, available as ``flask <command>``."""
+from flask import Blueprint, current_app
+from sqlalchemy.sql import func
+
+from extensions import assets, db, image_processor, search_index, storage
+from models import Article, AuthorStats, Comment, Discussion, DiscussionMessage, Like, User, trending
+from preload import compile_templates
+
+# No command group: the commands keep their top-level ``flask <command>`` names.
+bp = Blueprint('commands', __name__, cli_group=None)
+
+
+@bp.cli.command('backfill-counters')
+def backfill_counters():
+    """Recompute the denormalized like, comment, message and author counters."""
+    db.session.query(Article).update({
+        Article.like_count: db.select(func.count(Like.id))
+                              .where(Like.article_id == Article.id)
+                              .scalar_subquery(),
+        Article.comment_count: db.select(func.count(Comment.id))
+                                 .where(Comment.article_id == Article.id)
+                                 .scalar_subquery()
+    }, synchronize_session=False)
+    db.session.execute(db.insert(AuthorStats).from_select(
+        ['id'], db.select(User.id).where(User.id.not_in(db.select(AuthorStats.id)))
+    ))
+    db.session.query(AuthorStats).update({
+        AuthorStats.article_count: db.select(func.count(Article.id))
+                                     .where(Article.author_id == AuthorStats.id)
+                                     .scalar_subquery(),
+        AuthorStats.like_count: db.select(func.coalesce(func.sum(Article.like_count), 0))
+                                  .where(Article.author_id == AuthorStats.id)
+                                  .scalar_subquery(),
+        AuthorStats.comment_count: db.select(func.coalesce(func.sum(Article.comment_count), 0))
+                                     .where(Article.author_id == AuthorStats.id)
+                                     .scalar_subquery()
+    }, synchronize_session=False)
+    db.session.query(Discussion).update({
+        Discussion.message_count: db.select(func.count(DiscussionMessage.id))
+                                    .where(DiscussionMessage.discussion_id == Discussion.id)
+                                    .scalar_subquery()
+    }, synchronize_session=False)
+    db.session.commit()
+    print('Counters backfilled.')
+
+@bp.cli.command('process-images')
+def process_images():
+    """Generate resized and WebP variants for uploads that have none yet."""
+    if not image_processor.available:
+        print('Pillow is not installed; nothing to do.')
+        return
+    print(f'Processed {image_processor.backfill()} images.')
+
+@bp.cli.command('build-assets')
+def build_assets():
+    """Minify, bundle, fingerprint and precompress static files into static/dist."""
+    manifest = assets.build()
+    print(f'Built {len(manifest)} static assets.')
+
+@bp.cli.command('gc-uploads')
+def gc_uploads():
+    """Recount upload references and delete blobs nothing uses."""
+    removed = storage.rebuild()
+    print(f'Removed {len(removed)} unreferenced uploads.')
+
+@bp.cli.command('rebuild-search-index')
+def rebuild_search_index():
+    """Create the full-text search tables and repopulate them."""
+    search_index.create_all(rebuild=True)
+    print('Search index rebuilt.')
+
+@bp.cli.command('rebuild-trending')
+def rebuild_trending():
+    """Recompute the trending and top-this-week scores of every article."""
+    print(f'Ranked {trending.rebuild()} articles.')
+
+@bp.cli.command('compile-templates')
+def compile_templates_command():
+    """Compile every template into the Jinja bytecode cache."""
+    print(f'Compiled {compile_templates(current_app)} templates.')
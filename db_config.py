@@ -0,0 +1,92 @@
+# =============================================
+# DATABASE CONFIGURATION
+# =============================================
+"""Engine settings for running Miso under a multi-threaded WSGI server.
+
+``DATABASE_URL`` picks the database (SQLite by default, PostgreSQL or any
+other SQLAlchemy URL otherwise).  SQLite connections are switched to WAL
+journaling so readers no longer block behind the occasional comment, like
+or message write, and get a busy timeout instead of failing immediately
+with "database is locked".
+
+``DATABASE_REPLICA_URLS`` (comma separated) adds read replicas; see
+``db_routing`` for how statements are routed between them and the primary.
+"""
+import os
+import sqlite3
+
+from sqlalchemy import event
+
+DEFAULT_DATABASE_URL = 'sqlite:///miso.db'
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,          # milliseconds
+    'cache_size': -64000,          # negative means KiB, i.e. 64 MB per connection
+    'mmap_size': 268435456,        # 256 MB
+    'temp_store': 'MEMORY',
+}
+
+
+def database_url():
+    url = os.environ.get('DATABASE_URL', DEFAULT_DATABASE_URL)
+    # Heroku-style URLs still use the scheme SQLAlchemy 1.4 dropped.
+    if url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+def replica_binds():
+    urls = [url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    return {f'replica_{i}': url for i, url in enumerate(urls)}
+
+
+def engine_options(url):
+    pool_size = int(os.environ.get('DB_POOL_SIZE', 10))
+    max_overflow = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    if url.startswith('sqlite'):
+        if url in ('sqlite://', 'sqlite:///:memory:'):
+            return {}
+        return {
+            'pool_size': pool_size,
+            'max_overflow': max_overflow,
+            'connect_args': {'check_same_thread': False, 'timeout': SQLITE_PRAGMAS['busy_timeout'] / 1000},
+        }
+    return {
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': 1800,
+        'pool_pre_ping': True,
+    }
+
+
+def configure_database(app):
+    """Fill in the SQLAlchemy settings; must run before ``SQLAlchemy(app)``."""
+    url = app.config.setdefault('SQLALCHEMY_DATABASE_URI', database_url())
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(url))
+    app.config.setdefault('SQLALCHEMY_BINDS', replica_binds())
+    app.config.setdefault('REPLICA_STICKY_SECONDS', int(os.environ.get('REPLICA_STICKY_SECONDS', 5)))
+    app.config.setdefault('SQLITE_PRAGMAS', SQLITE_PRAGMAS)
+
+
+def apply_sqlite_pragmas(app, db):
+    """Set ``SQLITE_PRAGMAS`` on every new connection of the app's engines.
+
+    The listeners go on this app's engines rather than on ``Engine``, so
+    building another app does not run the PRAGMAs twice per connection.
+    """
+    pragmas = app.config['SQLITE_PRAGMAS']
+
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        if not isinstance(dbapi_connection, sqlite3.Connection):
+            return
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'connect', set_sqlite_pragmas)
@@ -0,0 +1,69 @@
+# =============================================
+# READ/WRITE SESSION ROUTING
+# =============================================
+"""Send reads to replica databases and writes to the primary.
+
+Replicas are plain Flask-SQLAlchemy binds named ``replica_<n>`` (see
+``db_config.replica_binds``).  ``RoutingSession`` picks a random replica for
+every read and the primary for flushes, DML and raw SQL.  Once a request
+has written, it and the same client's requests for the next
+``REPLICA_STICKY_SECONDS`` read from the primary too, so a reader who just
+commented is never shown a replica that has not caught up yet.
+
+With no replicas configured every statement goes to the primary, exactly as
+before.
+"""
+import random
+import time
+
+import sqlalchemy as sa
+from flask import current_app, g, has_request_context, session
+from flask_sqlalchemy.session import Session
+
+REPLICA_PREFIX = 'replica_'
+STICKY_SESSION_KEY = '_db_primary_until'
+
+
+def _is_write(clause):
+    if clause is None:
+        return False
+    if isinstance(clause, sa.sql.dml.UpdateBase):
+        return True
+    if isinstance(clause, sa.sql.Select):
+        return clause._for_update_arg is not None
+    # Raw text and anything we cannot classify is sent to the primary to be safe.
+    return not isinstance(clause, sa.sql.Selectable)
+
+
+def mark_primary():
+    """Pin this request, and the client's next few, to the primary database."""
+    if not has_request_context():
+        return
+    g.db_use_primary = True
+    sticky_until = time.time() + current_app.config.get('REPLICA_STICKY_SECONDS', 5)
+    if session.get(STICKY_SESSION_KEY, 0) < sticky_until - 1:
+        session[STICKY_SESSION_KEY] = sticky_until
+
+
+def _use_primary():
+    if not has_request_context():
+        return False
+    if g.get('db_use_primary'):
+        return True
+    return session.get(STICKY_SESSION_KEY, 0) > time.time()
+
+
+class RoutingSession(Session):
+    def _replicas(self):
+        return [engine for key, engine in self._db.engines.items()
+                if key is not None and key.startswith(REPLICA_PREFIX)]
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            replicas = self._replicas()
+            if replicas:
+                if self._flushing or _is_write(clause):
+                    mark_primary()
+                elif not _use_primary():
+                    return random.choice(replicas)
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
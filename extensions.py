@@ -0,0 +1,37 @@
+# =============================================
+# EXTENSIONS
+# =============================================
+"""Extension instances shared by the models, views and CLI commands.
+
+They are created unbound here and attached to an application by
+``create_app()``, so importing a view or model never builds an app.
+Services that need the models (trending, the author cache, the like
+buffer, ...) live next to them in ``models.py``.
+"""
+from flask_migrate import Migrate
+from flask_sqlalchemy import SQLAlchemy
+
+from assets import Assets
+from cache import TTLCache
+from db_routing import RoutingSession
+from images import ImageProcessor
+from metrics import Metrics
+from page_cache import PageCache
+from passwords import PasswordHasher
+from query_budget import QueryBudget
+from realtime import Realtime
+from search_index import SearchIndex
+from storage import UploadStorage
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+migrate = Migrate()
+search_index = SearchIndex(db)
+query_budgets = QueryBudget()
+metrics = Metrics()
+page_cache = PageCache()
+image_processor = ImageProcessor(db=db)
+storage = UploadStorage(db=db, on_delete=image_processor.discard)
+assets = Assets()
+realtime = Realtime()
+passwords = PasswordHasher()
+category_counts_cache = TTLCache(ttl=300)
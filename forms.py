@@ -0,0 +1,68 @@
+# =============================================
+# FORMS
+# =============================================
+from flask_wtf import FlaskForm
+from flask_wtf.file import FileField, FileAllowed
+from wtforms import StringField, PasswordField, SubmitField, TextAreaField, SelectField
+from wtforms.validators import DataRequired, Length, ValidationError
+
+from models import CATEGORIES, User
+
+
+class LoginForm(FlaskForm):
+    class Meta:
+        csrf = False
+        
+    email = StringField('Email', validators=[DataRequired()])
+    password = PasswordField('Password', validators=[DataRequired()])
+    submit = SubmitField('Login')
+
+class SignupForm(FlaskForm):
+    class Meta:
+        csrf = False
+        
+    username = StringField('Username', validators=[DataRequired(), Length(min=4)])
+    email = StringField('Email', validators=[DataRequired()])
+    password = PasswordField('Password', validators=[DataRequired(), Length(min=6)])
+    submit = SubmitField('Sign Up')
+    profile_pic = FileField('Profile Picture', validators=[
+        FileAllowed(['jpg', 'png', 'jpeg'], 'Images only!')
+    ])
+    
+    def validate_username(self, username):
+        user = User.query.filter_by(username=username.data).first()
+        if user:
+            raise ValidationError('Username already taken. Choose another.')
+    
+    def validate_email(self, email):
+        user = User.query.filter_by(email=email.data).first()
+        if user:
+            raise ValidationError('Email already registered.')
+        if '@' not in email.data:
+            raise ValidationError('Please enter a valid email address')
+
+class ArticleForm(FlaskForm):
+    class Meta:
+        csrf = False
+        
+    title = StringField('Title', validators=[DataRequired(), Length(max=200)])
+    content = TextAreaField('Content', validators=[DataRequired()])
+    excerpt = TextAreaField('Excerpt', validators=[Length(max=300)])
+    category = SelectField('Category', choices=[
+        (category['name'], category['name'].capitalize()) for category in CATEGORIES
+    ], validators=[DataRequired()])
+    image = FileField('Article Image', validators=[
+        FileAllowed(['jpg', 'png', 'jpeg'], 'Images only!')
+    ])
+    submit = SubmitField('Publish')
+
+class DiscussionForm(FlaskForm):
+    class Meta:
+        csrf = False
+        
+    title = StringField('Title', validators=[DataRequired(), Length(max=200)])
+    description = TextAreaField('Description', validators=[DataRequired()])
+    profile_pic = FileField('Discussion Image', validators=[
+        FileAllowed(['jpg', 'png', 'jpeg'], 'Images only!')
+    ])
+    submit = SubmitField('Create Discussion')
@@ -0,0 +1,194 @@
+# =============================================
+# HELPER FUNCTIONS
+# =============================================
+from datetime import datetime, timezone
+
+from flask import abort, current_app, make_response, request, session, url_for
+from sqlalchemy.orm import defer, selectinload
+from sqlalchemy.sql import func
+
+from extensions import category_counts_cache, db, realtime, search_index
+from images import upload_url
+from models import (CATEGORIES, Article, AuthorStats, Discussion, DiscussionMessage, author_cache, like_buffer,
+                    suggestion_pool, trending)
+
+
+def allowed_file(filename):
+    return '.' in filename and \
+           filename.rsplit('.', 1)[1].lower() in current_app.config['ALLOWED_EXTENSIONS']
+
+def get_suggested_articles(article, limit=3):
+    return suggestion_pool.suggest(article, options=[defer(Article.content)],
+                                   same_category=2, limit=limit)
+
+def bump_counter(column, row_id, delta=1):
+    """Atomically add ``delta`` to a denormalized counter column in the current transaction.
+
+    Columns with an ``onupdate`` default (such as ``Article.updated_at``) are
+    refreshed by the same UPDATE.
+    """
+    model = column.class_
+    model.query.filter(model.id == row_id)\
+               .update({column: column + delta}, synchronize_session=False)
+
+def bump_author_stats(author_id, articles=0, likes=0, comments=0):
+    """Adjust an author's stats row in the current transaction.
+
+    ``author_id`` may also be a scalar subquery, e.g. the author of an article
+    the caller only knows by id.
+    """
+    deltas = {AuthorStats.article_count: articles, AuthorStats.like_count: likes,
+              AuthorStats.comment_count: comments}
+    AuthorStats.query.filter(AuthorStats.id == author_id)\
+                     .update({column: column + delta for column, delta in deltas.items() if delta},
+                             synchronize_session=False)
+
+def get_category_counts():
+    """Article count per category from one GROUP BY, cached between writes."""
+    return category_counts_cache.get_or_set('counts', lambda: dict(
+        db.session.query(Article.category, func.count(Article.id))
+                  .group_by(Article.category)
+                  .all()
+    ))
+
+def categories_with_counts():
+    counts = get_category_counts()
+    return [dict(category, article_count=counts.get(category['name'], 0)) for category in CATEGORIES]
+
+def article_listing_query(query='', category=''):
+    base_query = Article.query
+    if category and category.lower() != 'all':
+        base_query = base_query.filter_by(category=category)
+    if query:
+        base_query = search_index.filter(base_query, Article, query, rank=False)
+    return base_query
+
+def keyset_page(base_query, before=None, per_page=None):
+    """Return one newest-first page of articles and the cursor for the next one.
+
+    Pages are cut on ``Article.id`` rather than with OFFSET, so every page
+    costs the same no matter how deep the reader scrolls.
+    """
+    per_page = per_page or current_app.config['ARTICLES_PER_PAGE']
+    if before:
+        base_query = base_query.filter(Article.id < before)
+    articles = base_query.options(defer(Article.content))\
+                         .order_by(Article.id.desc())\
+                         .limit(per_page + 1)\
+                         .all()
+    next_cursor = articles[per_page - 1].id if len(articles) > per_page else None
+    return articles[:per_page], next_cursor
+
+def latest_articles(limit=6):
+    return Article.query.options(defer(Article.content)).order_by(Article.id.desc()).limit(limit).all()
+
+def ranked_articles(feed, category=None, limit=6):
+    """Top ``limit`` articles of a ``trending`` feed ('trending' or 'week'), from the precomputed ranks."""
+    return trending.ranked(Article.query.options(defer(Article.content)), feed, category)\
+                   .limit(limit)\
+                   .all()
+
+def article_validators(article_id, user_id=None):
+    """Cheap ETag and Last-Modified for an article page, from one narrow query."""
+    row = db.session.query(Article.like_count, Article.comment_count, Article.updated_at)\
+                    .filter(Article.id == article_id)\
+                    .first()
+    if row is None:
+        abort(404)
+    like_count, comment_count, updated_at = row
+    # Buffered likes change the page before they reach the row.
+    like_count += like_buffer.pending_delta(article_id)
+    updated_at = (updated_at or datetime(1970, 1, 1)).replace(tzinfo=timezone.utc, microsecond=0)
+    etag = f'a{article_id}-{like_count}-{comment_count}-{int(updated_at.timestamp())}'
+    if user_id is not None:
+        etag += f'-u{user_id}'
+    return etag, updated_at
+
+def not_modified(etag, last_modified):
+    """True when the client's cached copy is still current (and nothing is waiting to be flashed)."""
+    if '_flashes' in session:
+        return False
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    return bool(request.if_modified_since) and last_modified <= request.if_modified_since
+
+def conditional(response, etag, last_modified, cache_control):
+    response = make_response(response)
+    response.set_etag(etag, weak=True)
+    response.last_modified = last_modified
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+def message_payload(message, author):
+    """JSON-ready description of a discussion message, as pushed to and fetched by clients."""
+    timestamp = message.timestamp
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return {
+        'id': message.id,
+        'discussion_id': message.discussion_id,
+        'text': message.text,
+        'author_id': author.id,
+        'author': author.username,
+        'avatar': upload_url(author.profile_pic, author.profile_pic_variants, 320)
+                  if author.profile_pic != 'default.jpg'
+                  else url_for('static', filename='images/default.jpg'),
+        'timestamp': timestamp.isoformat(),
+        'time': timestamp.strftime('%b %d, %H:%M')
+    }
+
+def message_payloads(messages):
+    authors = author_cache.authors_of(messages)
+    return [message_payload(message, authors[message.author_id]) for message in messages]
+
+def messages_after(discussion_id, after_id, limit=200):
+    messages = DiscussionMessage.query.filter(DiscussionMessage.discussion_id == discussion_id,
+                                            DiscussionMessage.id > after_id)\
+                                    .order_by(DiscussionMessage.id.asc())\
+                                    .limit(limit)\
+                                    .all()
+    return message_payloads(messages)
+
+def message_cursor(message):
+    return f"{message.timestamp.strftime('%Y%m%d%H%M%S%f')}-{message.id}"
+
+def parse_message_cursor(cursor):
+    try:
+        timestamp, message_id = cursor.split('-')
+        return datetime.strptime(timestamp, '%Y%m%d%H%M%S%f'), int(message_id)
+    except (AttributeError, ValueError):
+        return None
+
+def message_window(discussion_id, before=None, per_page=None):
+    """The ``per_page`` messages preceding cursor ``before`` (the newest ones without it), oldest first.
+
+    Returns ``(messages, earlier_cursor)``; ``earlier_cursor`` is None once
+    the start of the discussion is reached.
+    """
+    per_page = per_page or current_app.config['MESSAGES_PER_PAGE']
+    key = db.tuple_(DiscussionMessage.timestamp, DiscussionMessage.id)
+    query = DiscussionMessage.query.filter(DiscussionMessage.discussion_id == discussion_id)
+    cursor = parse_message_cursor(before)
+    if cursor is not None:
+        query = query.filter(key < db.tuple_(*cursor))
+    messages = query.order_by(DiscussionMessage.timestamp.desc(), DiscussionMessage.id.desc())\
+                    .limit(per_page + 1)\
+                    .all()
+    earlier_cursor = message_cursor(messages[per_page - 1]) if len(messages) > per_page else None
+    return messages[:per_page][::-1], earlier_cursor
+
+def post_discussion_message(discussion_id, author_id, text):
+    """Store a message, bump the discussion's counter and push it to connected clients."""
+    message = DiscussionMessage(text=text, author_id=author_id, discussion_id=discussion_id)
+    db.session.add(message)
+    bump_counter(Discussion.message_count, discussion_id)
+    db.session.flush()
+    # Built before commit so the message is not reloaded afterwards.
+    payload = message_payload(message, author_cache.get(author_id))
+    db.session.commit()
+    realtime.publish(f'discussion:{discussion_id}', payload)
+    return payload
+
+def article_page_query():
+    """Article query that loads every comment up front; authors come from ``author_cache``."""
+    return Article.query.options(selectinload(Article.comments))
@@ -0,0 +1,205 @@
+# =============================================
+# IMAGE VARIANTS
+# =============================================
+"""Resized and WebP copies of uploaded images, generated off the request path.
+
+Upload routes save the original and call ``image_processor.submit(filename)``.
+The resizing runs in a small process pool (so request threads never wait on
+Pillow or the GIL), writes one WebP and one JPEG/PNG file per width in
+``IMAGE_VARIANT_WIDTHS`` under ``<UPLOAD_FOLDER>/variants/`` with all EXIF and
+other metadata stripped, and then records the list of variants on every row
+that references the upload, e.g.::
+
+    [{'width': 320, 'webp': 'variants/<stem>-320.webp', 'src': 'variants/<stem>-320.jpg'}, ...]
+
+Templates use the ``upload_url`` and ``upload_srcset`` globals to pick a size.
+Rows without variants (Pillow not installed, processing still running, or
+old uploads before ``flask process-images`` was run) simply fall back to the
+original file.
+"""
+import glob
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from flask import current_app, url_for
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional: without it uploads are served as-is.
+    Image = ImageOps = None
+
+DEFAULT_WIDTHS = (320, 640, 1280)
+VARIANTS_DIR = 'variants'
+
+
+# =============================================
+# WORKER FUNCTION (runs in the process pool)
+# =============================================
+def render_variants(path, directory, widths, quality=80):
+    """Write the variants of the image at ``path`` and return their descriptions."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    os.makedirs(os.path.join(directory, VARIANTS_DIR), exist_ok=True)
+    with Image.open(path) as original:
+        image = ImageOps.exif_transpose(original)
+        has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+    fallback_ext, fallback_format = ('png', 'PNG') if has_alpha else ('jpg', 'JPEG')
+
+    variants = []
+    for width in sorted(widths):
+        if width > image.width:
+            if variants:
+                break
+            # Smaller than every target width: keep one re-encoded copy at its own size.
+            width = image.width
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.LANCZOS) if width != image.width else image.copy()
+        resized.info = {}
+
+        webp_name = f'{VARIANTS_DIR}/{stem}-{width}.webp'
+        src_name = f'{VARIANTS_DIR}/{stem}-{width}.{fallback_ext}'
+        resized.save(os.path.join(directory, webp_name), 'WEBP', quality=quality, method=4)
+        if fallback_format == 'JPEG':
+            resized.save(os.path.join(directory, src_name), 'JPEG', quality=quality, optimize=True, progressive=True)
+        else:
+            resized.save(os.path.join(directory, src_name), 'PNG', optimize=True)
+        variants.append({'width': width, 'webp': webp_name, 'src': src_name})
+    return variants
+
+
+# =============================================
+# TEMPLATE HELPERS
+# =============================================
+def upload_url(filename, variants=None, width=None):
+    """URL of an upload, or of its smallest variant at least ``width`` pixels wide."""
+    if variants and width:
+        fitting = [v for v in variants if v['width'] >= width] or variants[-1:]
+        return url_for('static', filename='uploads/' + fitting[0]['webp'])
+    return url_for('static', filename='uploads/' + filename)
+
+
+def upload_srcset(variants, kind='webp'):
+    """``srcset`` attribute value for an upload's variants ('' when there are none)."""
+    if not variants:
+        return ''
+    return ', '.join(f"{url_for('static', filename='uploads/' + v[kind])} {v['width']}w" for v in variants)
+
+
+# =============================================
+# PROCESSOR
+# =============================================
+class ImageProcessor:
+    def __init__(self, app=None, db=None):
+        self.db = db
+        self._targets = []
+        self._executor = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('IMAGE_VARIANT_WIDTHS', DEFAULT_WIDTHS)
+        app.config.setdefault('IMAGE_WORKERS', int(os.environ.get('IMAGE_WORKERS', 2)))
+        app.add_template_global(upload_url)
+        app.add_template_global(upload_srcset)
+        if not self.available:
+            app.logger.warning('Pillow is not installed; uploads are served without resized variants')
+
+    def register(self, file_column, variants_column):
+        """Record variants in ``variants_column`` on rows whose ``file_column`` names the upload."""
+        self._targets.append((file_column, variants_column))
+
+    @property
+    def available(self):
+        return Image is not None
+
+    def _eager(self):
+        # Tests and the CLI process inline instead of through the pool.
+        return current_app.config.get('IMAGE_PROCESSING_EAGER', current_app.testing)
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                # Spawned, not forked: the parent holds DB connections and request threads.
+                self._executor = ProcessPoolExecutor(max_workers=current_app.config['IMAGE_WORKERS'],
+                                                     mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+
+    def _args(self, filename):
+        directory = os.path.abspath(current_app.config['UPLOAD_FOLDER'])
+        return os.path.join(directory, filename), directory, tuple(current_app.config['IMAGE_VARIANT_WIDTHS'])
+
+    # ---------------------------------------------
+    # Public API
+    # ---------------------------------------------
+    def submit(self, filename):
+        """Queue variant generation for a freshly saved upload."""
+        if not self.available:
+            return
+        existing = self._existing_variants(filename)
+        if existing:
+            # Content-addressed uploads: another row already has this exact image.
+            self._record(filename, existing)
+            return
+        if self._eager():
+            self._record(filename, render_variants(*self._args(filename)))
+            return
+        future = self._pool().submit(render_variants, *self._args(filename))
+        # The callback runs on the pool's thread, outside this app context.
+        future.add_done_callback(partial(self._done, current_app._get_current_object(), filename))
+
+    def discard(self, filename):
+        """Delete the variant files of an upload that is being removed."""
+        stem = os.path.splitext(filename)[0]
+        pattern = os.path.join(current_app.config['UPLOAD_FOLDER'], VARIANTS_DIR, glob.escape(stem) + '-*')
+        for path in glob.glob(pattern):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def backfill(self):
+        """Generate variants for every referenced upload that has none; returns how many were processed."""
+        if not self.available:
+            return 0
+        filenames = set()
+        for file_column, variants_column in self._targets:
+            rows = self.db.session.query(file_column).filter(variants_column.is_(None)).distinct()
+            filenames.update(name for (name,) in rows
+                             if os.path.exists(os.path.join(current_app.config['UPLOAD_FOLDER'], name)))
+        filenames = sorted(filenames)
+        results = self._pool().map(render_variants, *zip(*map(self._args, filenames))) if filenames else []
+        for filename, variants in zip(filenames, results):
+            self._record(filename, variants)
+        return len(filenames)
+
+    # ---------------------------------------------
+    # Recording results
+    # ---------------------------------------------
+    def _done(self, app, filename, future):
+        try:
+            variants = future.result()
+        except Exception:
+            app.logger.exception('Generating image variants for %s failed', filename)
+            return
+        with app.app_context():
+            self._record(filename, variants)
+
+    def _existing_variants(self, filename):
+        for file_column, variants_column in self._targets:
+            variants = self.db.session.query(variants_column)\
+                                      .filter(file_column == filename, variants_column.isnot(None))\
+                                      .limit(1)\
+                                      .scalar()
+            if variants:
+                return variants
+        return None
+
+    def _record(self, filename, variants):
+        for file_column, variants_column in self._targets:
+            file_column.class_.query.filter(file_column == filename)\
+                                    .update({variants_column: variants}, synchronize_session=False)
+        self.db.session.commit()
@@ -0,0 +1,203 @@
+# =============================================
+# LIKE WRITE-BEHIND BUFFER
+# =============================================
+"""Coalesce like/unlike clicks in memory and write them in bulk.
+
+Every click used to be its own read, insert-or-delete, counter update and
+commit, so a viral article turned into a queue of writers fighting over
+SQLite's single write lock.  Requests now only record the user's intent
+("user U wants article A liked / not liked") with ``set_many()``;
+repeated toggles of the same pair simply overwrite each other.  A
+background thread flushes the surviving intents every
+``LIKE_FLUSH_INTERVAL`` seconds in one transaction: one bulk insert, one
+bulk delete and one statement recounting ``like_count`` for the touched
+articles.
+
+Until a flush lands, ``liked()`` and ``pending_delta()`` let the worker that
+took the click answer as if it already had.  Intents still buffered when the
+process dies uncleanly are lost (at most one interval's worth); a normal
+shutdown flushes them.  ``LIKE_BUFFER_EAGER`` (default ``app.testing``)
+writes each batch through immediately instead.
+"""
+import atexit
+import os
+import threading
+import time
+
+import sqlalchemy as sa
+from flask import current_app
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+class LikeBuffer:
+    def __init__(self, app=None, db=None, like_model=None, count_column=None, on_write=None, on_flush=None):
+        self.db = db
+        self.like_model = like_model
+        self.count_column = count_column
+        self.on_write = on_write        # (connection, changes), inside the flush transaction
+        self.on_flush = on_flush        # (changes), once it has committed
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}      # (user_id, article_id) -> (liked in the database, liked wanted)
+        self._delta = {}        # article_id -> net like_count change still buffered
+        self._thread = None
+        self._pid = None
+        self._app = None        # app the flusher thread writes through
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('LIKE_FLUSH_INTERVAL', float(os.environ.get('LIKE_FLUSH_INTERVAL', 0.5)))
+        app.config.setdefault('LIKE_BUFFER_MAX_PENDING', 1000)
+        atexit.register(self._flush_at_exit)
+
+    def _eager(self):
+        return current_app.config.get('LIKE_BUFFER_EAGER', current_app.testing)
+
+    # ---------------------------------------------
+    # Recording intents
+    # ---------------------------------------------
+    def liked(self, user_id, article_id, default=False):
+        """Whether the user likes the article, counting intents not flushed yet."""
+        with self._lock:
+            entry = self._pending.get((user_id, article_id))
+        return default if entry is None else entry[1]
+
+    def pending_delta(self, article_id):
+        with self._lock:
+            return self._delta.get(article_id, 0)
+
+    def set_many(self, user_id, intents):
+        """Record ``{article_id: liked}`` intents for one user.
+
+        Returns ``{article_id: (liked, like_count)}`` as the user should now
+        see them; articles that do not exist are left out.  Counts shown
+        before a flush are best effort, the flush's recount makes the stored
+        ones exact.
+        """
+        Like = self.like_model
+        model = self.count_column.class_
+        rows = self.db.session.query(model.id, self.count_column, Like.id)\
+                              .outerjoin(Like, sa.and_(Like.article_id == model.id, Like.user_id == user_id))\
+                              .filter(model.id.in_(list(intents)))\
+                              .all()
+        results = {}
+        with self._lock:
+            for article_id, like_count, like_id in rows:
+                key = (user_id, article_id)
+                wanted = intents[article_id]
+                base, before = self._pending.get(key, (like_id is not None, like_id is not None))
+                if wanted != before:
+                    self._delta[article_id] = self._delta.get(article_id, 0) + (1 if wanted else -1)
+                if wanted == base:
+                    # Toggled back to what the database already says: nothing to write.
+                    self._pending.pop(key, None)
+                else:
+                    self._pending[key] = (base, wanted)
+                results[article_id] = (wanted, like_count + self._delta.get(article_id, 0))
+            backlog = len(self._pending)
+        if self._eager() or backlog >= current_app.config['LIKE_BUFFER_MAX_PENDING']:
+            self.flush()
+        elif backlog:
+            self._ensure_flusher()
+        return results
+
+    # ---------------------------------------------
+    # Flushing
+    # ---------------------------------------------
+    def _ensure_flusher(self):
+        self._app = current_app._get_current_object()
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                # Started lazily so a pre-fork master never owns it.
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='like-buffer-flush', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            app = self._app
+            time.sleep(app.config['LIKE_FLUSH_INTERVAL'])
+            try:
+                with app.app_context():
+                    self.flush()
+            except Exception:
+                app.logger.exception('Flushing buffered likes failed')
+
+    def _flush_at_exit(self):
+        if self._pending and self._app is not None:
+            with self._app.app_context():
+                self.flush()
+
+    def flush(self):
+        """Write every buffered intent in one transaction; returns ``{article_id: net like change}``."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                deltas, self._delta = self._delta, {}
+            if not batch:
+                return {}
+            changes = {}
+            for (_, article_id), (_, wanted) in batch.items():
+                changes[article_id] = changes.get(article_id, 0) + (1 if wanted else -1)
+            try:
+                self._write(batch, changes)
+            except Exception:
+                with self._lock:
+                    # Newer intents recorded meanwhile win over the failed batch.
+                    for key, entry in batch.items():
+                        self._pending.setdefault(key, entry)
+                    for article_id, delta in deltas.items():
+                        self._delta[article_id] = self._delta.get(article_id, 0) + delta
+                raise
+        if self.on_flush is not None:
+            self.on_flush(changes)
+        return changes
+
+    def _write(self, batch, changes):
+        Like = self.like_model
+        table = Like.__table__
+        added = [{'user_id': user_id, 'article_id': article_id}
+                 for (user_id, article_id), (_, wanted) in batch.items() if wanted]
+        removed = [(user_id, article_id) for (user_id, article_id), (_, wanted) in batch.items() if not wanted]
+        article_ids = sorted(changes)
+        model = self.count_column.class_
+        with self.db.engine.begin() as connection:
+            if added:
+                connection.execute(self._insert_likes(connection, table, model.__table__), added)
+            if removed:
+                connection.execute(
+                    table.delete().where(sa.tuple_(table.c.user_id, table.c.article_id).in_(removed))
+                )
+            # Recounting (rather than adding deltas) stays exact even when another
+            # worker flushed the same pair in between.
+            connection.execute(
+                model.__table__.update()
+                     .where(model.__table__.c.id.in_(article_ids))
+                     .values({self.count_column.key: sa.select(sa.func.count())
+                                                       .where(table.c.article_id == model.__table__.c.id)
+                                                       .scalar_subquery()})
+            )
+            if self.on_write is not None:
+                self.on_write(connection, changes)
+
+    @staticmethod
+    def _insert_likes(connection, table, articles):
+        """Insert ``user_id``/``article_id`` rows, skipping duplicates and articles deleted meanwhile.
+
+        An article deleted since its intents were recorded (possibly by another
+        worker) would otherwise be left with orphan likes.
+        """
+        article_id = sa.bindparam('article_id', type_=table.c.article_id.type)
+        rows = sa.select(sa.bindparam('user_id', type_=table.c.user_id.type), article_id)\
+                 .where(sa.exists().where(articles.c.id == article_id))
+        dialect = connection.dialect.name
+        if dialect == 'sqlite':
+            insert = sqlite.insert(table).on_conflict_do_nothing()
+        elif dialect == 'postgresql':
+            insert = postgresql.insert(table).on_conflict_do_nothing()
+        else:
+            insert = table.insert()
+        return insert.from_select(['user_id', 'article_id'], rows)
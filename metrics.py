@@ -0,0 +1,194 @@
+# =============================================
+# REQUEST INSTRUMENTATION
+# =============================================
+"""Per-request timings, a ``Server-Timing`` header and a ``/metrics`` endpoint.
+
+Every request records its total latency, how many SQL statements it ran and
+how long they took (timed with SQLAlchemy cursor events), and how long
+Jinja spent rendering.  The numbers go out three ways:
+
+* a ``Server-Timing`` header (``db``, ``tpl`` and ``total``), which browser
+  devtools show next to the request, so a slow page says where its time went;
+* per-endpoint histograms, served in the Prometheus text format at
+  ``/metrics`` (protected by a bearer token when ``METRICS_TOKEN`` is set);
+* a warning in the app log for every statement slower than
+  ``SLOW_QUERY_MS``, with its ``EXPLAIN QUERY PLAN`` (``EXPLAIN`` on
+  PostgreSQL) so a missing index is obvious from the log alone.
+
+All of it costs two clock reads per statement and a few dictionary updates
+per request.  Histograms live in the worker process, so with several
+workers each scrape sees one of them; label the target per worker or run
+Prometheus against each.
+"""
+import bisect
+import hmac
+import os
+import threading
+import time
+from collections import defaultdict
+
+from flask import (Response, abort, before_render_template, current_app, g, has_app_context, has_request_context,
+                   request, template_rendered)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from query_budget import statement_count
+
+# Upper bounds of the histogram buckets; +Inf is implied.
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+HISTOGRAMS = {
+    'miso_request_duration_seconds': ('Time spent handling the request.', SECONDS_BUCKETS),
+    'miso_request_sql_duration_seconds': ('Time spent executing SQL during the request.', SECONDS_BUCKETS),
+    'miso_request_sql_statements': ('SQL statements executed during the request.', STATEMENT_BUCKETS),
+    'miso_request_template_seconds': ('Time spent rendering templates during the request.', SECONDS_BUCKETS),
+}
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class Metrics:
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._histograms = defaultdict(dict)
+        self._slow_queries = defaultdict(int)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('SLOW_QUERY_MS', float(os.environ.get('SLOW_QUERY_MS', 100)))
+        app.config.setdefault('METRICS_TOKEN', os.environ.get('METRICS_TOKEN'))
+        # Engine-wide, so only once per process however many apps are built.
+        for identifier, listener in (('before_cursor_execute', self._before_execute),
+                                     ('after_cursor_execute', self._after_execute),
+                                     ('handle_error', self._failed)):
+            if not event.contains(Engine, identifier, listener):
+                event.listen(Engine, identifier, listener)
+        before_render_template.connect(self._before_render, app)
+        template_rendered.connect(self._after_render, app)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.add_url_rule('/metrics', 'metrics', self.export)
+
+    # ---------------------------------------------
+    # Measuring
+    # ---------------------------------------------
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_started'].pop()
+        if has_request_context():
+            g.sql_seconds = g.get('sql_seconds', 0.0) + elapsed
+        # Statements run outside an app (seeding scripts, say) have no threshold to check.
+        if has_app_context() and elapsed * 1000 >= current_app.config['SLOW_QUERY_MS']:
+            self._log_slow(conn, statement, parameters, executemany, elapsed)
+
+    def _failed(self, context):
+        started = context.connection.info.get('query_started') if context.connection is not None else None
+        if started:
+            started.pop()
+
+    def _log_slow(self, conn, statement, parameters, executemany, elapsed):
+        endpoint = request.endpoint if has_request_context() else None
+        with self._lock:
+            self._slow_queries[endpoint or ''] += 1
+        current_app.logger.warning('Slow query (%.1f ms) in %s:\n%s\n%s', elapsed * 1000, endpoint or 'no request',
+                                   statement, self._plan(conn, statement, parameters, executemany))
+
+    def _plan(self, conn, statement, parameters, executemany):
+        prefix = {'sqlite': 'EXPLAIN QUERY PLAN ', 'postgresql': 'EXPLAIN '}.get(conn.dialect.name)
+        if prefix is None or executemany or not statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            return '(no plan)'
+        # A separate cursor, so the result the caller is about to fetch is left alone.
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(prefix + statement, parameters)
+            return '\n'.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
+        except Exception as exc:
+            return f'(no plan: {exc})'
+        finally:
+            cursor.close()
+
+    def _before_render(self, sender, template, context, **extra):
+        g.setdefault('template_started', []).append(time.perf_counter())
+
+    def _after_render(self, sender, template, context, **extra):
+        started = g.get('template_started')
+        if started:
+            g.template_seconds = g.get('template_seconds', 0.0) + time.perf_counter() - started.pop()
+
+    def _start(self):
+        g.request_started = time.perf_counter()
+
+    def _finish(self, response):
+        started = g.get('request_started')
+        if started is None:
+            return response
+        total = time.perf_counter() - started
+        sql_seconds = g.get('sql_seconds', 0.0)
+        template_seconds = g.get('template_seconds', 0.0)
+        statements = statement_count()
+        response.headers.add('Server-Timing',
+                             f'db;dur={sql_seconds * 1000:.1f};desc="{statements} queries", '
+                             f'tpl;dur={template_seconds * 1000:.1f}, total;dur={total * 1000:.1f}')
+        if request.endpoint not in (None, 'metrics', 'static'):
+            self._observe(request.endpoint, request.method, {
+                'miso_request_duration_seconds': total,
+                'miso_request_sql_duration_seconds': sql_seconds,
+                'miso_request_sql_statements': statements,
+                'miso_request_template_seconds': template_seconds,
+            })
+        return response
+
+    def _observe(self, endpoint, method, values):
+        key = (endpoint, method)
+        with self._lock:
+            for name, value in values.items():
+                histogram = self._histograms[name].get(key)
+                if histogram is None:
+                    histogram = self._histograms[name][key] = Histogram(HISTOGRAMS[name][1])
+                histogram.observe(value)
+
+    # ---------------------------------------------
+    # Exporting
+    # ---------------------------------------------
+    def export(self):
+        token = current_app.config['METRICS_TOKEN']
+        if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            abort(401)
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+    def render(self):
+        """The collected metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, (help_text, buckets) in HISTOGRAMS.items():
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+                for (endpoint, method), histogram in sorted(self._histograms[name].items()):
+                    labels = f'endpoint="{endpoint}",method="{method}"'
+                    cumulative = 0
+                    for bound, count in zip(buckets + ('+Inf',), histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_sum{{{labels}}} {histogram.total:.6f}')
+                    lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+            lines += ['# HELP miso_slow_queries_total SQL statements slower than SLOW_QUERY_MS.',
+                      '# TYPE miso_slow_queries_total counter']
+            for endpoint, count in sorted(self._slow_queries.items()):
+                lines.append(f'miso_slow_queries_total{{endpoint="{endpoint}"}} {count}')
+        return '\n'.join(lines) + '\n'
@@ -1,4 +1,5 @@
 import logging
+import re
 from logging.config import fileConfig
 
 from flask import current_app
@@ -45,6 +46,16 @@ target_db = current_app.extensions['migrate'].db
 # ... etc.
 
 
+# FTS5 virtual tables and their shadow tables (article_fts, article_fts_data,
+# ...) are managed by search_index.py, not the models; without this
+# autogenerate would emit drops for them.
+FTS_TABLE_RE = re.compile(r'^\w+_fts(_\w+)?$')
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    return not (type_ == 'table' and FTS_TABLE_RE.match(name))
+
+
 def get_metadata():
     if hasattr(target_db, 'metadatas'):
         return target_db.metadatas[None]
@@ -65,7 +76,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_object=include_object
     )
 
     with context.begin_transaction():
@@ -93,6 +105,7 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    conf_args.setdefault("include_object", include_object)
 
     connectable = get_engine()
 
@@ -0,0 +1,69 @@
+"""plain-text search index
+
+Revision ID: 0b6d2e8f4a13
+Revises: f1a7c3e9b520
+Create Date: 2026-10-18 19:05:12.384619
+
+"""
+from html import unescape
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b6d2e8f4a13'
+down_revision = 'f1a7c3e9b520'
+branch_labels = None
+depends_on = None
+
+
+# (index, source table, columns, columns holding HTML)
+INDEXES = [
+    ('article_fts', 'article', ('title', 'content', 'category'), ('content',)),
+    ('discussion_fts', 'discussion', ('title', 'description'), ()),
+    ('user_fts', 'user', ('username', 'email'), ()),
+]
+TAG_RE = re.compile(r'<[^>]*>')
+
+
+def strip_tags(html):
+    if not html:
+        return html
+    return ' '.join(unescape(TAG_RE.sub(' ', html)).split())
+
+
+def upgrade():
+    # The indexes used to read their text from the source tables, markup
+    # included; they now keep their own plain-text copy.
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+    for name, source, fields, html in INDEXES:
+        op.execute(f'DROP TABLE IF EXISTS {name}')
+        op.execute(
+            f"CREATE VIRTUAL TABLE {name} USING fts5("
+            f"{', '.join(fields)}, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        rows = bind.execute(sa.text(f'SELECT id, {", ".join(fields)} FROM "{source}"')).fetchall()
+        if rows:
+            bind.execute(
+                sa.text(f'INSERT INTO {name}(rowid, {", ".join(fields)}) '
+                        f'VALUES (:rowid, {", ".join(":" + f for f in fields)})'),
+                [{'rowid': row[0], **{f: strip_tags(value) if f in html else value
+                                      for f, value in zip(fields, row[1:])}} for row in rows],
+            )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for name, source, fields, _ in INDEXES:
+        op.execute(f'DROP TABLE IF EXISTS {name}')
+        op.execute(
+            f"CREATE VIRTUAL TABLE {name} USING fts5("
+            f"{', '.join(fields)}, content='{source}', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        op.execute(f"INSERT INTO {name}({name}) VALUES ('rebuild')")
@@ -0,0 +1,43 @@
+"""full-text search index
+
+Revision ID: 8f41c2a7d3e5
+Revises: 3d198cbad967
+Create Date: 2026-10-18 09:12:04.518233
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f41c2a7d3e5'
+down_revision = '3d198cbad967'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('article_fts', 'article', ('title', 'content', 'category')),
+    ('discussion_fts', 'discussion', ('title', 'description')),
+    ('user_fts', 'user', ('username', 'email')),
+]
+
+
+def upgrade():
+    # FTS5 virtual tables only exist on SQLite; other engines use the ilike fallback.
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for name, source, fields in INDEXES:
+        op.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {name} USING fts5("
+            f"{', '.join(fields)}, content='{source}', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        op.execute(f"INSERT INTO {name}({name}) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for name, _, _ in INDEXES:
+        op.execute(f'DROP TABLE IF EXISTS {name}')
@@ -0,0 +1,144 @@
+# =============================================
+# DATABASE MODELS
+# =============================================
+"""Models, categories, and the services built on top of the models."""
+from datetime import datetime, timezone
+
+from sqlalchemy.sql import func
+
+from authors import AuthorCache
+from extensions import db, image_processor, page_cache, search_index, storage
+from like_buffer import LikeBuffer
+from suggestions import SuggestionPool
+from trending import LIKE_WEIGHT, Trending
+
+
+# =============================================
+# CATEGORIES
+# =============================================
+CATEGORIES = [
+    {'name': 'art', 'description': 'Creative expressions', 'color': '#FF9FEE', 'icon': 'fas fa-paint-brush'},
+    {'name': 'culture', 'description': 'Global traditions', 'color': '#B3B0FF', 'icon': 'fas fa-globe'},
+    {'name': 'sport', 'description': 'Athletic excellence', 'color': '#FD0261', 'icon': 'fas fa-running'},
+    {'name': 'economy', 'description': 'Market dynamics', 'color': '#aae354', 'icon': 'fas fa-chart-line'},
+    {'name': 'technology', 'description': 'Digital innovations', 'color': '#A4A1AA', 'icon': 'fas fa-laptop-code'},
+    {'name': 'health', 'description': 'Mind and body wellness', 'color': '#524F56', 'icon': 'fas fa-heartbeat'},
+    {'name': 'entrepreneurship', 'description': 'Startup journeys', 'color': '#252275', 'icon': 'fas fa-lightbulb'},
+    {'name': 'other', 'description': 'Miscellaneous gems', 'color': '#91558e', 'icon': 'fas fa-ellipsis-h'}
+]
+CATEGORY_META = {category['name']: category for category in CATEGORIES}
+
+
+# =============================================
+# MODELS
+# =============================================
+class User(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), unique=True, nullable=False)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    password = db.Column(db.String(200), nullable=False)
+    profile_pic = db.Column(db.String(200), default='default.jpg')
+    profile_pic_variants = db.Column(db.JSON)
+    articles = db.relationship('Article', backref='author', lazy=True)
+    liked_articles = db.relationship('Like', backref='user', lazy=True, foreign_keys='Like.user_id')
+    comments = db.relationship('Comment', backref='author', lazy=True)
+    discussion_messages = db.relationship('DiscussionMessage', backref='author', lazy=True)
+    stats = db.relationship('AuthorStats', uselist=False, lazy=True)
+
+class AuthorStats(db.Model):
+    # One row per user, updated in the same transaction as the writes it counts.
+    __tablename__ = 'author_stats'
+    id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    article_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    like_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    comment_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+@db.event.listens_for(User, 'after_insert')
+def create_author_stats(mapper, connection, target):
+    connection.execute(AuthorStats.__table__.insert().values(id=target.id))
+
+class Article(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(200), nullable=False)
+    content = db.Column(db.Text, nullable=False)
+    excerpt = db.Column(db.String(300))
+    category = db.Column(db.String(50), nullable=False, index=True)
+    date = db.Column(db.String(50), default=lambda: datetime.now(timezone.utc).strftime('%B %d, %Y'))
+    image_url = db.Column(db.String(200), default='default_article.jpg')
+    image_variants = db.Column(db.JSON)
+    author_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    like_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    comment_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc),
+                           onupdate=lambda: datetime.now(timezone.utc))
+    comments = db.relationship('Comment', backref='article', lazy=True)
+    likes = db.relationship('Like', backref='article', lazy=True)
+
+class Discussion(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text, nullable=False)
+    profile_pic = db.Column(db.String(200), default='default_discussion.jpg')
+    profile_pic_variants = db.Column(db.JSON)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+    author_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    message_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    messages = db.relationship('DiscussionMessage', backref='discussion', lazy=True)
+
+class DiscussionMessage(db.Model):
+    # Serves both "messages of a discussion" and the (timestamp, id) history cursor.
+    __table_args__ = (db.Index('ix_discussion_message_history', 'discussion_id', 'timestamp', 'id'),)
+    id = db.Column(db.Integer, primary_key=True)
+    text = db.Column(db.Text, nullable=False)
+    timestamp = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    author_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    discussion_id = db.Column(db.Integer, db.ForeignKey('discussion.id'), nullable=False)
+
+class Comment(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    text = db.Column(db.Text, nullable=False)
+    timestamp = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    author_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    article_id = db.Column(db.Integer, db.ForeignKey('article.id'), nullable=False, index=True)
+
+class Like(db.Model):
+    # The unique (user_id, article_id) index also serves lookups by user_id alone.
+    __table_args__ = (db.Index('uq_like_user_article', 'user_id', 'article_id', unique=True),)
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    article_id = db.Column(db.Integer, db.ForeignKey('article.id'), nullable=False, index=True)
+    timestamp = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+# =============================================
+# MODEL SERVICES
+# =============================================
+search_index.register(Article, ['title', 'content', 'category'], weights=[10.0, 1.0, 2.0], html=['content'])
+search_index.register(Discussion, ['title', 'description'], weights=[5.0, 1.0])
+search_index.register(User, ['username', 'email'], weights=[2.0, 1.0])
+suggestion_pool = SuggestionPool(db, Article)
+image_processor.register(User.profile_pic, User.profile_pic_variants)
+image_processor.register(Article.image_url, Article.image_variants)
+image_processor.register(Discussion.profile_pic, Discussion.profile_pic_variants)
+storage.register(User.profile_pic)
+storage.register(Article.image_url)
+storage.register(Discussion.profile_pic)
+trending = Trending(db=db, article_model=Article, like_model=Like, comment_model=Comment)
+author_cache = AuthorCache(db=db, user_model=User)
+
+def likes_written(connection, changes):
+    """Update what is derived from like counts, in the transaction that flushed them."""
+    trending.record({article_id: LIKE_WEIGHT * change for article_id, change in changes.items()}, connection)
+    authors = db.select(Article.author_id).where(Article.id.in_(list(changes)))
+    connection.execute(db.update(AuthorStats)
+                         .where(AuthorStats.id.in_(authors))
+                         .values(like_count=db.select(func.coalesce(func.sum(Article.like_count), 0))
+                                              .where(Article.author_id == AuthorStats.id)
+                                              .scalar_subquery()))
+
+def likes_flushed(changes):
+    # The trending feeds on the home page move with like counts too.
+    page_cache.invalidate('trending', *[f'article:{i}' for i in changes])
+
+like_buffer = LikeBuffer(db=db, like_model=Like, count_column=Article.like_count, on_write=likes_written,
+                         on_flush=likes_flushed)
@@ -0,0 +1,193 @@
+# =============================================
+# RENDERED PAGE CACHE
+# =============================================
+"""Full-response cache for pages every logged-out visitor sees identically.
+
+Views opt in with ``@page_cache.cached(tags=...)``.  Only anonymous GET
+requests with no pending flash messages are served from or stored in the
+cache, keyed by path plus the sorted query string.
+
+Invalidation is tag based: each stored page remembers the version of every
+tag it was rendered under (``article:<id>``, ``category:<name>``,
+``articles``, ``trending``), and ``page_cache.invalidate(tag)`` simply gives
+the tag a new version, so every page carrying it misses on its next lookup.  Because the
+versions live in the same backend as the pages, a shared backend (the
+filesystem one, or any object with ``get``/``set``) invalidates across all
+workers at once.
+
+Every response served through the cache carries a weak ETag (the view's
+own, or a hash of the body) and ``PAGE_CACHE_CONTROL``, and is answered with
+``304 Not Modified`` when the client or a CDN already holds that version.
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+import uuid
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import make_response, request, session
+
+from cache import TTLCache
+
+
+# =============================================
+# BACKENDS
+# =============================================
+class NullBackend:
+    def get(self, key):
+        return None
+
+    def get_many(self, keys):
+        return [None] * len(keys)
+
+    def set(self, key, value, ttl=None):
+        pass
+
+
+class MemoryBackend:
+    """Per-process LRU backend."""
+
+    def __init__(self, maxsize=1000):
+        self._cache = TTLCache(ttl=None, maxsize=maxsize)
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def get_many(self, keys):
+        return [self._cache.get(key) for key in keys]
+
+    def set(self, key, value, ttl=None):
+        self._cache.set(key, value, ttl)
+
+
+class FileSystemBackend:
+    """Backend shared by every worker on the host, one pickle file per key."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                expires_at, value = pickle.load(f)
+        except (OSError, EOFError, pickle.PickleError):
+            return None
+        if expires_at is not None and expires_at <= time.time():
+            return None
+        return value
+
+    def get_many(self, keys):
+        return [self.get(key) for key in keys]
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump((expires_at, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._path(key))
+
+
+# =============================================
+# PAGE CACHE
+# =============================================
+class PageCache:
+    def __init__(self, app=None, backend=None):
+        self.backend = backend
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PAGE_CACHE_BACKEND', os.environ.get('PAGE_CACHE_BACKEND', 'memory'))
+        app.config.setdefault('PAGE_CACHE_TTL', int(os.environ.get('PAGE_CACHE_TTL', 300)))
+        app.config.setdefault('PAGE_CACHE_MAXSIZE', 1000)
+        app.config.setdefault('PAGE_CACHE_DIR', os.path.join(app.instance_path, 'page_cache'))
+        app.config.setdefault('PAGE_CACHE_CONTROL',
+                              f"public, max-age=60, s-maxage={app.config['PAGE_CACHE_TTL']}, "
+                              f"stale-while-revalidate=30")
+        self.ttl = app.config['PAGE_CACHE_TTL']
+        self.cache_control = app.config['PAGE_CACHE_CONTROL']
+        if self.backend is None:
+            kind = app.config['PAGE_CACHE_BACKEND']
+            if kind == 'filesystem':
+                self.backend = FileSystemBackend(app.config['PAGE_CACHE_DIR'])
+            elif kind == 'memory':
+                self.backend = MemoryBackend(app.config['PAGE_CACHE_MAXSIZE'])
+            else:
+                self.backend = NullBackend()
+
+    # ---------------------------------------------
+    # Tags
+    # ---------------------------------------------
+    def invalidate(self, *tags):
+        for tag in tags:
+            self.backend.set(f'tag:{tag}', uuid.uuid4().hex)
+
+    def _tag_versions(self, tags):
+        keys = [f'tag:{tag}' for tag in tags]
+        versions = self.backend.get_many(keys)
+        for i, version in enumerate(versions):
+            if version is None:
+                versions[i] = uuid.uuid4().hex
+                self.backend.set(keys[i], versions[i])
+        return dict(zip(tags, versions))
+
+    # ---------------------------------------------
+    # Decorator
+    # ---------------------------------------------
+    @staticmethod
+    def _cacheable_request():
+        return request.method == 'GET' and 'user_id' not in session and '_flashes' not in session
+
+    @staticmethod
+    def _key():
+        query = urlencode(sorted(request.args.items(multi=True)))
+        return f'page:{request.path}?{query}'
+
+    def cached(self, tags=(), ttl=None):
+        """Cache the view's response for anonymous visitors.
+
+        ``tags`` is a list of tag names or a callable receiving the view's
+        keyword arguments and returning one.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self._cacheable_request():
+                    return view(*args, **kwargs)
+
+                key = self._key()
+                entry = self.backend.get(key)
+                if entry is not None:
+                    stored_versions, status, headers, body = entry
+                    if self.backend.get_many([f'tag:{t}' for t in stored_versions]) == list(stored_versions.values()):
+                        response = self._app_response(body, status, headers)
+                        response.headers['X-Cache'] = 'HIT'
+                        return response.make_conditional(request)
+
+                page_tags = tags(**kwargs) if callable(tags) else list(tags)
+                versions = self._tag_versions(page_tags)
+                response = self._app_response(view(*args, **kwargs))
+                if response.status_code == 200 and not response.direct_passthrough and not session.modified:
+                    if 'ETag' not in response.headers:
+                        response.add_etag(weak=True)
+                    response.headers.setdefault('Cache-Control', self.cache_control)
+                    headers = [(k, v) for k, v in response.headers.items() if k.lower() != 'content-length']
+                    self.backend.set(key, (versions, response.status_code, headers, response.get_data()),
+                                     ttl or self.ttl)
+                response.headers['X-Cache'] = 'MISS'
+                return response.make_conditional(request)
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def _app_response(*args):
+        response = make_response(*args)
+        response.vary.add('Cookie')
+        return response
@@ -0,0 +1,110 @@
+# =============================================
+# PASSWORD HASHING
+# =============================================
+"""Password hashing off the request threads, with a bounded backlog.
+
+Hashing is deliberately slow, and done inline it held a request thread (and
+the GIL) for the whole computation, so a burst of logins starved every page
+read served by the same process.  ``passwords.hash()`` and
+``passwords.verify()`` now run the work in a small process pool.  At most
+``PASSWORD_HASH_MAX_PENDING`` hashes may be queued or running at once; past
+that, callers get ``HashingBusy`` (a 503 with ``Retry-After``) immediately
+instead of queueing behind the storm.
+
+``PASSWORD_HASH_METHOD`` takes any fully spelled-out Werkzeug method string
+(``scrypt:32768:8:1``, ``pbkdf2:sha256:1000000``, ...).  Stored hashes made
+with a different method or cost are upgraded transparently: ``verify()``
+returns a fresh hash alongside a successful check, for the caller to save.
+``PASSWORD_HASH_EAGER`` (default ``app.testing``) hashes inline.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+from flask import current_app
+from werkzeug.exceptions import ServiceUnavailable
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+
+
+class HashingBusy(ServiceUnavailable):
+    description = 'Too many sign-ins are being processed right now. Please try again in a moment.'
+
+
+# =============================================
+# WORKER FUNCTIONS (run in the process pool)
+# =============================================
+def hash_password(password, method):
+    return generate_password_hash(password, method=method)
+
+
+def verify_password(stored, password, method):
+    """``(matches, new_hash)``; ``new_hash`` is set when ``stored`` used another method or cost."""
+    if not check_password_hash(stored, password):
+        return False, None
+    if stored.split('$', 1)[0] == method:
+        return True, None
+    return True, generate_password_hash(password, method=method)
+
+
+# =============================================
+# SERVICE
+# =============================================
+class PasswordHasher:
+    def __init__(self, app=None):
+        self._executor = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PASSWORD_HASH_METHOD', os.environ.get('PASSWORD_HASH_METHOD', DEFAULT_METHOD))
+        app.config.setdefault('PASSWORD_HASH_WORKERS',
+                              int(os.environ.get('PASSWORD_HASH_WORKERS', max(1, (os.cpu_count() or 2) // 2))))
+        app.config.setdefault('PASSWORD_HASH_MAX_PENDING', app.config['PASSWORD_HASH_WORKERS'] * 4)
+        app.config.setdefault('PASSWORD_HASH_TIMEOUT', 10)
+        self._slots = threading.BoundedSemaphore(app.config['PASSWORD_HASH_MAX_PENDING'])
+
+    @property
+    def method(self):
+        return current_app.config['PASSWORD_HASH_METHOD']
+
+    def _eager(self):
+        return current_app.config.get('PASSWORD_HASH_EAGER', current_app.testing)
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                # Spawned, not forked: the parent holds DB connections and request threads.
+                self._executor = ProcessPoolExecutor(max_workers=current_app.config['PASSWORD_HASH_WORKERS'],
+                                                     mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+
+    def _run(self, function, *args):
+        if self._eager():
+            return function(*args)
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy(retry_after=1)
+        try:
+            future = self._pool().submit(function, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot is held until the work itself finishes, even if this request gives up on it.
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=current_app.config['PASSWORD_HASH_TIMEOUT'])
+        except FutureTimeout:
+            raise HashingBusy(retry_after=1)
+
+    # ---------------------------------------------
+    # Public API
+    # ---------------------------------------------
+    def hash(self, password):
+        return self._run(hash_password, password, self.method)
+
+    def verify(self, stored, password):
+        """Check ``password`` against ``stored``; returns ``(matches, new_hash_or_None)``."""
+        return self._run(verify_password, stored, password, self.method)
@@ -0,0 +1,78 @@
+# =============================================
+# TEMPLATE CACHE AND PRELOADING
+# =============================================
+"""Start-up work done once, before the WSGI server forks its workers.
+
+A fresh worker used to compile each template on its first hit and load the
+suggestion pool and category counts on demand, so the first requests after
+a deploy or a scale-out were the slowest.  Two things fix that:
+
+* ``init_template_cache(app)`` gives Jinja a filesystem bytecode cache
+  (``JINJA_BYTECODE_CACHE_DIR``), so a process that does have to load a
+  template skips parsing and compiling it once any process has done so.
+* ``warm_up(app)`` compiles every template and fills the shared read-only
+  caches.  Run it in the server's master process::
+
+      gunicorn --preload 'app:create_app(preload=True)'
+
+  and every forked worker inherits the compiled templates and loaded caches
+  copy-on-write.  It ends by disposing of the database pools, so no worker
+  shares a connection with its parent, and with ``gc.freeze()``, so garbage
+  collections in the workers leave the inherited pages alone instead of
+  copying them.  Without ``--preload`` each worker warms itself as it boots,
+  which still keeps the cost off its first requests.
+"""
+import gc
+import os
+import time
+
+from jinja2 import FileSystemBytecodeCache
+from sqlalchemy.exc import SQLAlchemyError
+
+from extensions import db
+from helpers import get_category_counts
+from models import suggestion_pool
+
+
+def init_template_cache(app):
+    app.config.setdefault('JINJA_BYTECODE_CACHE_DIR', os.environ.get(
+        'JINJA_BYTECODE_CACHE_DIR', os.path.join(app.instance_path, 'jinja_cache')))
+    directory = app.config['JINJA_BYTECODE_CACHE_DIR']
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
+
+
+def compile_templates(app):
+    """Load every template into the environment's cache; returns how many there are."""
+    env = app.jinja_env
+    names = env.list_templates(extensions=['html'])
+    # The default cache holds 400 templates; make sure none is evicted again.
+    if env.cache is not None and env.cache.capacity < len(names):
+        env.cache.capacity = len(names)
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+
+def warm_caches(app):
+    with app.app_context():
+        try:
+            get_category_counts()
+            suggestion_pool.load()
+        except SQLAlchemyError as exc:
+            # Typically a database that is not migrated yet; the caches fill on demand instead.
+            app.logger.warning('Skipping cache warm-up: %s', exc)
+        finally:
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+
+
+def warm_up(app):
+    started = time.perf_counter()
+    templates = compile_templates(app)
+    warm_caches(app)
+    gc.collect()
+    gc.freeze()
+    app.logger.info('Preloaded %d templates and shared caches in %.2fs', templates, time.perf_counter() - started)
@@ -0,0 +1,69 @@
+# =============================================
+# SQL QUERY BUDGETS
+# =============================================
+"""Count the SQL statements each request runs and hold routes to a budget.
+
+Routes declare how many statements they are allowed with ``@query_budget(n)``.
+Counting is always on (it is a single integer increment per statement), but
+the budget is only enforced when ``ENFORCE_QUERY_BUDGETS`` is set, which
+defaults to ``app.testing``.  An over-budget request then fails with an
+``AssertionError`` listing the statements it ran, so a template that starts
+lazily loading a relationship per row breaks the test suite instead of
+quietly slowing production down.
+"""
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+def query_budget(limit):
+    """Declare the maximum number of SQL statements a view may execute."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            return view(*args, **kwargs)
+        wrapper.query_budget = limit
+        return wrapper
+    return decorator
+
+
+def statement_count():
+    """Number of SQL statements executed so far in the current request."""
+    return g.get('sql_statement_count', 0)
+
+
+class QueryBudget:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # Engine-wide, so only once per process however many apps are built.
+        if not event.contains(Engine, 'before_cursor_execute', self._count):
+            event.listen(Engine, 'before_cursor_execute', self._count)
+        app.after_request(self._check)
+
+    def _enforced(self):
+        return current_app.config.get('ENFORCE_QUERY_BUDGETS', current_app.testing)
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany):
+        if not has_request_context():
+            return
+        g.sql_statement_count = g.get('sql_statement_count', 0) + 1
+        if self._enforced():
+            g.setdefault('sql_statements', []).append(statement)
+
+    def _check(self, response):
+        if not self._enforced() or request.endpoint is None:
+            return response
+        view = current_app.view_functions.get(request.endpoint)
+        limit = getattr(view, 'query_budget', None)
+        count = statement_count()
+        if limit is not None and count > limit:
+            statements = '\n'.join(f'  {s}' for s in g.get('sql_statements', []))
+            raise AssertionError(
+                f'{request.endpoint} ran {count} SQL statements, budget is {limit}:\n{statements}'
+            )
+        return response
@@ -0,0 +1,147 @@
+# =============================================
+# REAL-TIME EVENTS
+# =============================================
+"""Push new discussion messages to open pages with Server-Sent Events.
+
+Routes publish a small JSON payload per event with
+``realtime.publish(channel, payload)``; every open
+``realtime.stream(channel, ...)`` response subscribed to that channel writes
+it to its client as one SSE event, so a busy discussion costs one short
+message per post instead of a full page render per participant.
+
+Delivery goes through a broker.  The default ``MemoryBroker`` only reaches
+clients connected to the same process; multi-process deployments plug in a
+shared one (anything with ``publish(channel, payload)`` and
+``subscribe(channel)``) with ``REALTIME_BROKER = 'module:ClassName'``.
+Nothing is lost either way: every event carries the row id as its SSE id,
+and a reconnecting browser sends it back as ``Last-Event-ID``, so the stream
+replays whatever it missed from the database before going live.
+"""
+import json
+import os
+import queue
+import threading
+
+from flask import Response, request
+from werkzeug.utils import import_string
+
+
+# =============================================
+# BROKERS
+# =============================================
+class Subscription:
+    def __init__(self, broker, channel, maxsize):
+        self.broker = broker
+        self.channel = channel
+        self.queue = queue.Queue(maxsize)
+        self.overflowed = False
+
+    def get(self, timeout=None):
+        """Next payload, or None if nothing arrived within ``timeout`` seconds."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class MemoryBroker:
+    """In-process pub/sub: one bounded queue per connected client."""
+
+    def __init__(self, max_queue=256):
+        self.max_queue = max_queue
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel, self.max_queue)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._channels.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[subscription.channel]
+
+    def publish(self, channel, payload):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(payload)
+            except queue.Full:
+                # A stalled client: end its stream, it will reconnect and catch up.
+                subscription.overflowed = True
+
+
+# =============================================
+# EXTENSION
+# =============================================
+class Realtime:
+    def __init__(self, app=None, broker=None):
+        self.broker = broker
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('REALTIME_BROKER', os.environ.get('REALTIME_BROKER', 'memory'))
+        app.config.setdefault('REALTIME_KEEPALIVE_SECONDS', 15)
+        self.keepalive = app.config['REALTIME_KEEPALIVE_SECONDS']
+        if self.broker is None:
+            kind = app.config['REALTIME_BROKER']
+            self.broker = MemoryBroker() if kind == 'memory' else import_string(kind.replace(':', '.'))()
+
+    def publish(self, channel, payload):
+        self.broker.publish(channel, payload)
+
+    @staticmethod
+    def last_event_id(default=None):
+        """Id the client has already seen, from ``Last-Event-ID`` or ``?after=``."""
+        value = request.headers.get('Last-Event-ID') or request.args.get('after')
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return default
+
+    def stream(self, channel, backlog, last_id=0):
+        """SSE response: the events ``backlog(last_id)`` returns, then live ones from ``channel``.
+
+        ``backlog`` is called once, after subscribing, so nothing published
+        in between is missed.  The event generator deliberately runs outside
+        the request context: the request's database session is torn down as
+        soon as the headers go out instead of being held for the life of the
+        connection.
+        """
+        subscription = self.broker.subscribe(channel)
+        missed = backlog(last_id)
+
+        def events():
+            seen = last_id
+            yield 'retry: 3000\n\n'
+            for payload in missed:
+                seen = payload['id']
+                yield _format_event(payload)
+            while not subscription.overflowed:
+                payload = subscription.get(timeout=self.keepalive)
+                if payload is None:
+                    yield ': keep-alive\n\n'
+                elif payload['id'] > seen:
+                    seen = payload['id']
+                    yield _format_event(payload)
+
+        response = Response(events(), mimetype='text/event-stream')
+        # Runs when the client disconnects, even if the body was never started.
+        response.call_on_close(subscription.close)
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+
+
+def _format_event(payload):
+    return f"id: {payload['id']}\nevent: message\ndata: {json.dumps(payload)}\n\n"
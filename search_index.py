@@ -0,0 +1,200 @@
+# =============================================
+# FULL-TEXT SEARCH
+# =============================================
+"""Full-text search backed by SQLite FTS5.
+
+Every registered model gets a ``<table>_fts`` virtual table holding a copy of
+the listed columns.  Columns registered as ``html`` (article bodies are
+editor markup) are stored as plain text, so tag names are not searchable
+and snippets never show markup.  The index is kept in sync from mapper
+events, so any flush that inserts, updates or deletes an indexed row also
+updates the index inside the same transaction.
+
+When the database is not SQLite (or the FTS tables have not been created yet)
+searches fall back to the old ``ilike`` filters, so routes never have to care
+which engine they are running on.
+"""
+import re
+from html import unescape
+
+import sqlalchemy as sa
+from markupsafe import Markup, escape
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+_MARK_OPEN = '\x02'
+_MARK_CLOSE = '\x03'
+_TAG_RE = re.compile(r'<[^>]*>')
+_BATCH_SIZE = 5000
+
+
+class _Index:
+    def __init__(self, model, fields, weights, html):
+        self.model = model
+        self.fields = fields
+        self.weights = weights
+        self.html = html
+        self.source = model.__table__.name
+        self.name = f'{self.source}_fts'
+
+    def document(self, row):
+        values = {'rowid': row.id}
+        for field in self.fields:
+            value = getattr(row, field)
+            values[field] = strip_tags(value) if field in self.html else value
+        return values
+
+    def write(self, connection, row_id=None):
+        """Index the source row ``row_id``, or every row when it is None."""
+        columns = ', '.join(self.fields)
+        select = sa.select(sa.column('id'), *map(sa.column, self.fields)).select_from(sa.table(self.source))
+        if row_id is not None:
+            select = select.where(sa.column('id') == row_id)
+        insert = sa.text(f'INSERT INTO {self.name}(rowid, {columns}) '
+                         f'VALUES (:rowid, {", ".join(":" + f for f in self.fields)})')
+        rows = connection.execution_options(stream_results=True).execute(select)
+        for batch in rows.partitions(_BATCH_SIZE):
+            connection.execute(insert, [self.document(row) for row in batch])
+
+    def delete(self, connection, row_id):
+        connection.execute(sa.text(f'DELETE FROM {self.name} WHERE rowid = :id'), {'id': row_id})
+
+
+class SearchIndex:
+    """Registry of FTS5 indexes, one per searchable model."""
+
+    def __init__(self, db=None):
+        self.db = db
+        self._indexes = {}
+        self._available = None
+
+    def register(self, model, fields, weights=None, html=()):
+        """Index ``fields`` of ``model``; ``weights`` tune BM25 per column.
+
+        ``html`` names the fields holding markup, which is indexed as plain text.
+        """
+        index = _Index(model, tuple(fields), tuple(weights or (1.0,) * len(fields)), frozenset(html))
+        self._indexes[model] = index
+
+        @sa.event.listens_for(model, 'after_insert')
+        def after_insert(mapper, connection, target):
+            if self._is_available(connection):
+                index.write(connection, target.id)
+
+        @sa.event.listens_for(model, 'after_update')
+        def after_update(mapper, connection, target):
+            if self._is_available(connection) and self._changed(index, target):
+                index.delete(connection, target.id)
+                index.write(connection, target.id)
+
+        @sa.event.listens_for(model, 'before_delete')
+        def before_delete(mapper, connection, target):
+            if self._is_available(connection):
+                index.delete(connection, target.id)
+
+        return model
+
+    # ---------------------------------------------
+    # Schema management
+    # ---------------------------------------------
+    def create_all(self, rebuild=False):
+        """Create missing FTS tables and populate them from their source tables."""
+        engine = self.db.engine
+        if engine.dialect.name != 'sqlite':
+            return
+        with engine.begin() as connection:
+            for index in self._indexes.values():
+                exists = sa.inspect(connection).has_table(index.name)
+                if not exists:
+                    connection.execute(sa.text(create_table_sql(index.name, index.fields)))
+                elif rebuild:
+                    connection.execute(sa.text(f'DELETE FROM {index.name}'))
+                if rebuild or not exists:
+                    index.write(connection)
+        self._available = True
+
+    def _is_available(self, connection):
+        if self._available is None:
+            self._available = connection.dialect.name == 'sqlite' and all(
+                sa.inspect(connection).has_table(index.name) for index in self._indexes.values()
+            )
+        return self._available
+
+    @staticmethod
+    def _changed(index, target):
+        state = sa.inspect(target)
+        return any(state.attrs[field].history.has_changes() for field in index.fields)
+
+    # ---------------------------------------------
+    # Querying
+    # ---------------------------------------------
+    def filter(self, query, model, text, rank=True):
+        """Restrict ``query`` to rows of ``model`` matching ``text``.
+
+        With FTS available and ``rank`` set the result is ordered by BM25
+        relevance; callers may append their own ``order_by`` as a tie-breaker.
+        """
+        index = self._indexes[model]
+        match = match_expression(text)
+        if match is None:
+            return query.filter(sa.false())
+
+        if not self._is_available(self.db.session.connection()):
+            pattern = f'%{text}%'
+            return query.filter(sa.or_(*(getattr(model, f).ilike(pattern) for f in index.fields)))
+
+        columns = [sa.literal_column('rowid').label('rowid')]
+        if rank:
+            columns.append(sa.func.bm25(sa.literal_column(index.name), *index.weights).label('rank'))
+        hits = sa.select(*columns).select_from(sa.table(index.name)).where(
+            sa.literal_column(index.name).op('MATCH')(match)
+        ).subquery()
+        query = query.join(hits, hits.c.rowid == model.id)
+        return query.order_by(hits.c.rank) if rank else query
+
+    def snippets(self, model, ids, text, field, tokens=24):
+        """Return ``{id: Markup}`` with matched terms of ``field`` wrapped in ``<mark>``."""
+        index = self._indexes[model]
+        match = match_expression(text)
+        ids = list(ids)
+        if match is None or not ids or not self._is_available(self.db.session.connection()):
+            return {}
+
+        column = index.fields.index(field)
+        rows = self.db.session.execute(sa.text(
+            f"SELECT rowid, snippet({index.name}, {column}, :open, :close, '…', :tokens) "
+            f'FROM {index.name} WHERE {index.name} MATCH :match AND rowid IN :ids'
+        ).bindparams(sa.bindparam('ids', expanding=True)), {
+            'open': _MARK_OPEN, 'close': _MARK_CLOSE, 'tokens': tokens,
+            'match': match, 'ids': ids,
+        })
+        return {rowid: highlight(fragment) for rowid, fragment in rows}
+
+
+# =============================================
+# HELPERS
+# =============================================
+def create_table_sql(name, fields):
+    return (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {name} USING fts5("
+        f"{', '.join(fields)}, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+
+
+def strip_tags(html):
+    """Plain text of an HTML fragment: tags become word breaks and entities are decoded."""
+    if not html:
+        return html
+    return ' '.join(unescape(_TAG_RE.sub(' ', html)).split())
+
+
+def match_expression(text):
+    """Turn free user input into an FTS5 query where every word is a prefix match."""
+    tokens = _TOKEN_RE.findall(text or '')
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def highlight(fragment):
+    escaped = str(escape(fragment or ''))
+    return Markup(escaped.replace(_MARK_OPEN, '<mark>').replace(_MARK_CLOSE, '</mark>'))
@@ -0,0 +1,123 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const container = document.querySelector('.messages-container');
+    const form = document.querySelector('.message-form');
+    if (!container || !form) {
+        return;
+    }
+    const messagesUrl = container.getAttribute('data-messages-url');
+    const eventsUrl = container.getAttribute('data-events-url');
+    const currentUserId = parseInt(container.getAttribute('data-current-user-id'), 10);
+    const input = form.querySelector('.message-input');
+    let lastId = parseInt(container.getAttribute('data-last-id'), 10) || 0;
+
+    function buildMessage(message) {
+        const item = document.createElement('div');
+        item.className = 'message' + (message.author_id === currentUserId ? ' your-message' : '');
+        item.setAttribute('data-message-id', message.id);
+
+        const avatar = document.createElement('div');
+        avatar.className = 'message-avatar';
+        avatar.style.backgroundImage = `url('${message.avatar}')`;
+
+        const content = document.createElement('div');
+        content.className = 'message-content';
+        const header = document.createElement('div');
+        header.className = 'message-header';
+        const author = document.createElement('span');
+        author.className = 'message-author';
+        author.textContent = message.author;
+        const time = document.createElement('span');
+        time.className = 'message-time';
+        time.textContent = message.time;
+        header.append(author, time);
+        const text = document.createElement('p');
+        text.className = 'message-text';
+        text.textContent = message.text;
+        content.append(header, text);
+
+        item.append(avatar, content);
+        return item;
+    }
+
+    function appendMessage(message) {
+        // The same message can arrive from the POST response and the stream.
+        if (container.querySelector(`[data-message-id="${message.id}"]`)) {
+            return;
+        }
+        const later = Array.from(container.querySelectorAll('[data-message-id]'))
+            .find(item => parseInt(item.getAttribute('data-message-id'), 10) > message.id);
+        container.insertBefore(buildMessage(message), later || null);
+        lastId = Math.max(lastId, message.id);
+        container.scrollTop = container.scrollHeight;
+    }
+
+    const loadEarlier = container.querySelector('.load-earlier');
+    if (loadEarlier) {
+        loadEarlier.addEventListener('click', function() {
+            const url = new URL(loadEarlier.getAttribute('data-endpoint'), window.location.origin);
+            url.searchParams.set('before', loadEarlier.getAttribute('data-cursor'));
+            loadEarlier.disabled = true;
+            fetch(url)
+                .then(response => response.json())
+                .then(data => {
+                    // Keep the messages the reader was looking at in place.
+                    const previousHeight = container.scrollHeight;
+                    const fragment = document.createDocumentFragment();
+                    data.messages.forEach(message => fragment.appendChild(buildMessage(message)));
+                    loadEarlier.after(fragment);
+                    container.scrollTop += container.scrollHeight - previousHeight;
+                    if (data.next_cursor) {
+                        loadEarlier.setAttribute('data-cursor', data.next_cursor);
+                    } else {
+                        loadEarlier.remove();
+                    }
+                })
+                .catch(error => console.error('Error:', error))
+                .finally(() => {
+                    loadEarlier.disabled = false;
+                });
+        });
+    }
+
+    function catchUp() {
+        const url = new URL(messagesUrl, window.location.origin);
+        url.searchParams.set('after', lastId);
+        return fetch(url)
+            .then(response => response.json())
+            .then(data => data.messages.forEach(appendMessage))
+            .catch(error => console.error('Error:', error));
+    }
+
+    if ('EventSource' in window) {
+        const url = new URL(eventsUrl, window.location.origin);
+        url.searchParams.set('after', lastId);
+        const source = new EventSource(url);
+        source.addEventListener('message', event => appendMessage(JSON.parse(event.data)));
+    } else {
+        setInterval(catchUp, 5000);
+    }
+
+    form.addEventListener('submit', function(e) {
+        e.preventDefault();
+        const text = input.value.trim();
+        if (!text) {
+            return;
+        }
+        fetch(messagesUrl, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json', 'Accept': 'application/json' },
+            body: JSON.stringify({ text: text })
+        })
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error('Network response was not ok');
+                }
+                return response.json();
+            })
+            .then(message => {
+                input.value = '';
+                appendMessage(message);
+            })
+            .catch(error => console.error('Error:', error));
+    });
+});
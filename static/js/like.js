@@ -1,45 +1,70 @@
 document.addEventListener('DOMContentLoaded', function() {
+    // Clicks update the button at once; the final state of every button
+    // touched within DEBOUNCE_MS goes to the server as one batch.
+    const DEBOUNCE_MS = 300;
+    const pending = new Map();
+    let timer = null;
+
     document.addEventListener('click', function(e) {
-        if (e.target.closest('.like-btn')) {
-            const likeBtn = e.target.closest('.like-btn');
-            const articleId = likeBtn.getAttribute('data-article-id');
-            toggleLike(articleId);
+        const likeBtn = e.target.closest('.like-btn');
+        if (likeBtn) {
+            toggleLike(likeBtn);
         }
     });
-    function toggleLike(articleId) {
-        fetch('/check_auth')
-            .then(response => response.json())
-            .then(data => {
-                if (!data.authenticated) {
+
+    function render(likeBtn, liked, likes) {
+        likeBtn.querySelector('.like-count').textContent = likes;
+        likeBtn.querySelector('.like-text').textContent = liked ? 'Liked' : 'Like';
+        likeBtn.classList.toggle('liked', liked);
+    }
+
+    function toggleLike(likeBtn) {
+        const liked = !likeBtn.classList.contains('liked');
+        const likeCount = likeBtn.querySelector('.like-count');
+        render(likeBtn, liked, parseInt(likeCount.textContent, 10) + (liked ? 1 : -1));
+        pending.set(likeBtn.getAttribute('data-article-id'), liked);
+        clearTimeout(timer);
+        timer = setTimeout(sendLikes, DEBOUNCE_MS);
+    }
+
+    function sendLikes() {
+        const likes = Array.from(pending, ([articleId, liked]) => ({ article_id: parseInt(articleId, 10), liked: liked }));
+        pending.clear();
+        const csrfMeta = document.querySelector('meta[name="csrf-token"]');
+        fetch('/api/likes', {
+            method: 'POST',
+            headers: Object.assign({ 'Content-Type': 'application/json' },
+                                   csrfMeta ? { 'X-CSRFToken': csrfMeta.content } : {}),
+            body: JSON.stringify({ likes: likes })
+        })
+            .then(response => {
+                if (response.status === 401) {
                     window.location.href = '/login';
+                    return null;
+                }
+                if (!response.ok) {
+                    throw new Error('Network response was not ok');
+                }
+                return response.json();
+            })
+            .then(data => {
+                if (!data) {
                     return;
                 }
-                const csrfToken = document.querySelector('meta[name="csrf-token"]').content;
-                fetch(`/article/${articleId}/like`, {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                        'X-CSRFToken': csrfToken
-                    },
-                })
-                .then(response => {
-                    if (!response.ok) {
-                        throw new Error('Network response was not ok');
+                data.likes.forEach(result => {
+                    // A click made while this batch was in flight wins over its answer.
+                    if (pending.has(String(result.article_id))) {
+                        return;
+                    }
+                    const likeBtn = document.querySelector(`.like-btn[data-article-id="${result.article_id}"]`);
+                    if (likeBtn) {
+                        render(likeBtn, result.liked, result.likes);
                     }
-                    return response.json();
-                })
-                .then(data => {
-                    const likeBtn = document.querySelector(`.like-btn[data-article-id="${articleId}"]`);
-                    const likeCount = likeBtn.querySelector('.like-count');
-                    const likeText = likeBtn.querySelector('.like-text');
-                    likeCount.textContent = data.likes;
-                    likeText.textContent = data.liked ? 'Liked' : 'Like';
-                    likeBtn.classList.toggle('liked', data.liked);
-                })
-                .catch(error => {
-                    console.error('Error:', error);
-                    alert('Error processing like. Please try again.');
                 });
+            })
+            .catch(error => {
+                console.error('Error:', error);
+                alert('Error processing like. Please try again.');
             });
     }
-});
\ No newline at end of file
+});
@@ -0,0 +1,92 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const loadMore = document.querySelector('.load-more');
+    if (!loadMore) {
+        return;
+    }
+    const grid = document.getElementById('article-listing');
+    let cursor = loadMore.getAttribute('data-cursor');
+    let loading = false;
+
+    function buildCard(article) {
+        const card = document.createElement('div');
+        card.className = 'card';
+
+        const header = document.createElement('div');
+        header.className = 'header';
+        const image = document.createElement('div');
+        image.className = 'image';
+        image.style.backgroundImage = `url('${article.image}')`;
+        const tag = document.createElement('span');
+        tag.className = 'tag';
+        tag.textContent = article.category;
+        image.appendChild(tag);
+        const date = document.createElement('div');
+        date.className = 'date';
+        const dateText = document.createElement('span');
+        dateText.textContent = article.date;
+        date.appendChild(dateText);
+        header.append(image, date);
+
+        const info = document.createElement('div');
+        info.className = 'info';
+        const link = document.createElement('a');
+        link.className = 'block';
+        link.href = article.url;
+        const title = document.createElement('span');
+        title.className = 'title';
+        title.textContent = article.title;
+        link.appendChild(title);
+        const description = document.createElement('p');
+        description.className = 'description';
+        if (article.snippet) {
+            // Snippets are escaped server-side and only carry <mark> tags.
+            description.innerHTML = article.snippet;
+        } else {
+            description.textContent = article.excerpt || '';
+        }
+        info.append(link, description);
+
+        card.append(header, info);
+        return card;
+    }
+
+    function fetchNextPage() {
+        if (loading || !cursor) {
+            return;
+        }
+        loading = true;
+        const url = new URL(loadMore.getAttribute('data-endpoint'), window.location.origin);
+        url.searchParams.set('before', cursor);
+        fetch(url)
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error('Network response was not ok');
+                }
+                return response.json();
+            })
+            .then(data => {
+                data.articles.forEach(article => grid.appendChild(buildCard(article)));
+                cursor = data.next_cursor;
+                if (!cursor) {
+                    loadMore.remove();
+                }
+            })
+            .catch(error => console.error('Error:', error))
+            .finally(() => {
+                loading = false;
+            });
+    }
+
+    loadMore.addEventListener('click', function(e) {
+        e.preventDefault();
+        fetchNextPage();
+    });
+
+    if ('IntersectionObserver' in window) {
+        new IntersectionObserver(entries => {
+            if (entries[0].isIntersecting) {
+                fetchNextPage();
+            }
+        }, { rootMargin: '400px' }).observe(loadMore);
+    }
+});
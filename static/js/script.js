@@ -47,43 +47,49 @@ document.addEventListener('DOMContentLoaded', function() {
   }, 3000);
 });
 function toggleLike(articleId) {
-  fetch('/check_auth')
-    .then(response => response.json())
-    .then(data => {
-      if (!data.authenticated) {
-        window.location.href = '/login';
-        return;
-      }
-      const csrfToken = document.querySelector('meta[name="csrf-token"]').content;
-      fetch(`/article/${articleId}/like`, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-          'X-CSRFToken': csrfToken
-        },
-      })
-      .then(response => response.json())
-      .then(data => {
-        const likeBtn = document.querySelector(`.like-btn[onclick="toggleLike(${articleId})"]`);
-        const likeCount = likeBtn.querySelector('.like-count');
-        const likeText = likeBtn.querySelector('.like-text');
-        likeCount.textContent = data.likes;
-        likeText.textContent = data.liked ? 'Liked' : 'Like';
-        likeBtn.classList.toggle('liked', data.liked);
-      })
-      .catch(error => console.error('Error:', error));
-    });
+  const likeBtn = document.querySelector(`.like-btn[onclick="toggleLike(${articleId})"]`);
+  fetch('/api/likes', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ likes: [{ article_id: articleId, liked: !likeBtn.classList.contains('liked') }] })
+  })
+  .then(response => {
+    if (response.status === 401) {
+      window.location.href = '/login';
+      return null;
+    }
+    return response.json();
+  })
+  .then(data => {
+    if (!data) {
+      return;
+    }
+    const result = data.likes[0];
+    const likeCount = likeBtn.querySelector('.like-count');
+    const likeText = likeBtn.querySelector('.like-text');
+    likeCount.textContent = result.likes;
+    likeText.textContent = result.liked ? 'Liked' : 'Like';
+    likeBtn.classList.toggle('liked', result.liked);
+  })
+  .catch(error => console.error('Error:', error));
+}
+// This file is also bundled into listing.js, so the editor code below must
+// not throw on pages without the article form (load_more.js comes after it).
+const articleForm = document.getElementById('article-form');
+if (articleForm) {
+  articleForm.addEventListener('submit', function(e) {
+    const editorContent = document.getElementById('editor').innerHTML;
+    document.getElementById('content').value = editorContent;
+  });
+  articleForm.addEventListener('submit', function(e) {
+    const editorContent = document.getElementById('editor').innerHTML;
+    const cleanContent = DOMPurify.sanitize(editorContent);
+    document.getElementById('content').value = cleanContent;
+  });
+}
+if (document.getElementById('editor') && typeof yourSavedHtmlContent !== 'undefined') {
+  document.getElementById('editor').innerHTML = yourSavedHtmlContent;
 }
-document.getElementById('article-form').addEventListener('submit', function(e) {
-  const editorContent = document.getElementById('editor').innerHTML;
-  document.getElementById('content').value = editorContent;
-});
-document.getElementById('article-form').addEventListener('submit', function(e) {
-  const editorContent = document.getElementById('editor').innerHTML;
-  const cleanContent = DOMPurify.sanitize(editorContent);
-  document.getElementById('content').value = cleanContent;
-});
-document.getElementById('editor').innerHTML = yourSavedHtmlContent;
 
 
 document.querySelectorAll('.reply-form form').forEach(form => {
@@ -0,0 +1,269 @@
+# =============================================
+# UPLOAD STORAGE
+# =============================================
+"""Content-addressed storage for user uploads.
+
+``storage.save(file)`` streams an uploaded file to a temporary file in
+``UPLOAD_FOLDER`` while hashing it, and then moves it to
+``<sha256>.<ext>``.  If a blob with that digest already exists the new copy
+is dropped, so the same picture uploaded a hundred times is stored once,
+and because a name never changes content it can be cached forever.
+
+Columns holding upload names are registered with ``storage.register``.
+Mapper events keep the ``upload_blob`` table's reference counts in step
+with inserts, updates and deletes of those columns inside the same
+transaction, and blobs whose count drops to zero are deleted (together
+with their image variants) once that transaction commits.  The column's
+default value (``default.jpg`` and friends) is never counted.
+
+``flask gc-uploads`` recounts references from scratch and sweeps anything
+the incremental path missed, such as files left behind by a crashed
+request.
+
+Request bodies are capped by ``MAX_CONTENT_LENGTH`` (Werkzeug answers 413
+before reading an oversized body), and ``UploadRequest`` makes the form
+parser write file parts straight to a temporary file in ``UPLOAD_FOLDER``
+in bounded chunks instead of spooling them in memory.  ``save`` checks the
+file's magic bytes, names the blob after the detected type rather than the
+client's extension, and publishes it with an atomic ``os.link``.
+"""
+import hashlib
+import os
+import tempfile
+import time
+
+import sqlalchemy as sa
+from flask import Request, current_app
+
+CHUNK_SIZE = 64 * 1024
+GC_SESSION_KEY = 'upload_gc_candidates'
+TEMP_PREFIX = '.upload-'
+
+IMAGE_SIGNATURES = (
+    (b'\xff\xd8\xff', '.jpg'),
+    (b'\x89PNG\r\n\x1a\n', '.png'),
+    (b'GIF87a', '.gif'),
+    (b'GIF89a', '.gif'),
+)
+
+
+class InvalidUpload(ValueError):
+    pass
+
+
+def sniff_image_type(head):
+    """Extension for the image format ``head`` starts with, or None."""
+    for signature, ext in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return ext
+    return None
+
+
+class UploadRequest(Request):
+    """Request whose multipart file parts are written to disk next to their final location."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        directory = current_app.config['UPLOAD_FOLDER']
+        os.makedirs(directory, exist_ok=True)
+        return tempfile.NamedTemporaryFile('wb+', dir=directory, prefix=TEMP_PREFIX)
+
+
+class UploadStorage:
+    def __init__(self, app=None, db=None, on_delete=None):
+        self.db = db
+        self.on_delete = on_delete
+        self._columns = []
+        self.table = sa.Table(
+            'upload_blob', db.metadata,
+            sa.Column('name', sa.String(200), primary_key=True),
+            sa.Column('ref_count', sa.Integer, nullable=False, default=0, server_default='0'),
+        )
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('MAX_CONTENT_LENGTH', int(os.environ.get('MAX_UPLOAD_MB', 8)) * 1024 * 1024)
+        app.request_class = UploadRequest
+        # Blobs younger than this are never collected: a concurrent request may
+        # have just deduplicated onto one and not committed its reference yet.
+        app.config.setdefault('UPLOAD_GC_GRACE_SECONDS', 300)
+        for identifier, listener in (('after_commit', self._after_commit),
+                                     ('after_soft_rollback', self._after_rollback)):
+            if not sa.event.contains(self.db.session, identifier, listener):
+                sa.event.listen(self.db.session, identifier, listener)
+
+    @property
+    def directory(self):
+        return current_app.config['UPLOAD_FOLDER']
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    # ---------------------------------------------
+    # Writing blobs
+    # ---------------------------------------------
+    def save(self, file):
+        """Store an uploaded ``FileStorage`` and return its content-addressed name.
+
+        Raises ``InvalidUpload`` when the content is not a supported image.
+        """
+        stream = file.stream
+        stream.seek(0)
+        head = stream.read(CHUNK_SIZE)
+        ext = sniff_image_type(head)
+        if ext is None:
+            raise InvalidUpload('Uploaded file is not a PNG, JPEG or GIF image')
+        digest = hashlib.sha256(head)
+
+        spooled = getattr(stream, 'name', None)
+        if isinstance(spooled, str) and os.path.dirname(os.path.abspath(spooled)) == os.path.abspath(self.directory):
+            # Already on disk beside its final location (see UploadRequest): hash it in place.
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+            stream.flush()
+            return self._publish(spooled, digest.hexdigest() + ext, link=True)
+
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=TEMP_PREFIX)
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                out.write(head)
+                for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                    out.write(chunk)
+            return self._publish(tmp_path, digest.hexdigest() + ext, link=False)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _publish(self, source, name, link):
+        """Atomically give ``source`` its final name, unless that blob already exists."""
+        target = self.path(name)
+        if os.path.exists(target):
+            # Deduplicated: refresh the mtime so the GC grace period covers this request.
+            os.utime(target)
+        elif link:
+            # The request's temp file deletes itself on close; the hard link keeps the data.
+            try:
+                os.link(source, target)
+            except FileExistsError:
+                pass
+        else:
+            os.replace(source, target)
+        return name
+
+    # ---------------------------------------------
+    # Reference counting
+    # ---------------------------------------------
+    def register(self, column):
+        """Count references held by ``column`` (an upload-name column of a mapped model)."""
+        default = column.default.arg if column.default is not None else None
+        key = column.key
+        self._columns.append((column, default))
+
+        def counted(name):
+            return bool(name) and name != default
+
+        @sa.event.listens_for(column.class_, 'after_insert')
+        def after_insert(mapper, connection, target):
+            name = getattr(target, key)
+            if counted(name):
+                self._adjust(connection, target, name, 1)
+
+        @sa.event.listens_for(column.class_, 'before_update')
+        def before_update(mapper, connection, target):
+            history = sa.inspect(target).attrs[key].history
+            if not history.has_changes():
+                return
+            for name in history.deleted:
+                if counted(name):
+                    self._adjust(connection, target, name, -1)
+            for name in history.added:
+                if counted(name):
+                    self._adjust(connection, target, name, 1)
+
+        @sa.event.listens_for(column.class_, 'after_delete')
+        def after_delete(mapper, connection, target):
+            state = sa.inspect(target)
+            name = state.committed_state.get(key, getattr(target, key))
+            if counted(name):
+                self._adjust(connection, target, name, -1)
+
+        return column
+
+    def _adjust(self, connection, target, name, delta):
+        updated = connection.execute(
+            self.table.update()
+                      .where(self.table.c.name == name)
+                      .values(ref_count=self.table.c.ref_count + delta)
+        )
+        if updated.rowcount == 0 and delta > 0:
+            connection.execute(self.table.insert().values(name=name, ref_count=delta))
+        if delta < 0:
+            sa.orm.object_session(target).info.setdefault(GC_SESSION_KEY, set()).add(name)
+
+    # ---------------------------------------------
+    # Garbage collection
+    # ---------------------------------------------
+    def _after_commit(self, session):
+        candidates = session.info.pop(GC_SESSION_KEY, None)
+        if candidates:
+            self.collect(candidates)
+
+    def _after_rollback(self, session, previous_transaction):
+        session.info.pop(GC_SESSION_KEY, None)
+
+    def collect(self, names):
+        """Delete the blobs among ``names`` that nothing references any more."""
+        grace = current_app.config['UPLOAD_GC_GRACE_SECONDS']
+        removed = []
+        with self.db.engine.begin() as connection:
+            for name in names:
+                try:
+                    if time.time() - os.path.getmtime(self.path(name)) < grace:
+                        continue
+                except OSError:
+                    pass
+                deleted = connection.execute(
+                    self.table.delete()
+                              .where(self.table.c.name == name)
+                              .where(self.table.c.ref_count <= 0)
+                )
+                if deleted.rowcount:
+                    removed.append(name)
+        for name in removed:
+            self._remove_file(name)
+        return removed
+
+    def _remove_file(self, name):
+        try:
+            os.remove(self.path(name))
+        except FileNotFoundError:
+            pass
+        if self.on_delete is not None:
+            self.on_delete(name)
+
+    def rebuild(self):
+        """Recount every reference, then delete unreferenced blobs and stray files."""
+        references = sa.union_all(*[
+            sa.select(column.label('name')).where(column.isnot(None)).where(column != default)
+            for column, default in self._columns
+        ]).subquery()
+        counts = sa.select(references.c.name, sa.func.count().label('ref_count'))\
+                   .group_by(references.c.name)
+        with self.db.engine.begin() as connection:
+            connection.execute(self.table.delete())
+            connection.execute(self.table.insert().from_select(['name', 'ref_count'], counts))
+            referenced = set(connection.execute(sa.select(self.table.c.name)).scalars())
+
+        grace = current_app.config['UPLOAD_GC_GRACE_SECONDS']
+        defaults = {default for _, default in self._columns}
+        removed = []
+        for entry in os.scandir(self.directory) if os.path.isdir(self.directory) else ():
+            if not entry.is_file() or entry.name in referenced or entry.name in defaults:
+                continue
+            if time.time() - entry.stat().st_mtime < grace:
+                continue
+            self._remove_file(entry.name)
+            removed.append(entry.name)
+        return removed
@@ -0,0 +1,101 @@
+# =============================================
+# ARTICLE SUGGESTIONS
+# =============================================
+"""Random "read next" suggestions without ``ORDER BY RANDOM()``.
+
+The pool keeps every article id in compact per-category arrays, so picking
+suggestions is a couple of ``random.randrange`` calls followed by a single
+primary-key lookup.  The arrays are loaded with one query, updated
+incrementally when articles are created or deleted in this process, and
+reloaded after ``ttl`` seconds to pick up writes made by other workers.
+"""
+import random
+import threading
+import time
+from array import array
+
+from cache import TTLCache
+
+
+class SuggestionPool:
+    def __init__(self, db, model, ttl=600, cache_ttl=60):
+        self.db = db
+        self.model = model
+        self.ttl = ttl
+        self.cache = TTLCache(ttl=cache_ttl, maxsize=10000)
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        self._by_category = {}
+        self._all = array('q')
+        self._removed = set()
+
+    # ---------------------------------------------
+    # Pool maintenance
+    # ---------------------------------------------
+    def _ensure_loaded(self):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl:
+            self.load()
+
+    def load(self):
+        """(Re)load every article id from the database."""
+        rows = self.db.session.query(self.model.id, self.model.category).all()
+        by_category = {}
+        all_ids = array('q')
+        for article_id, category in rows:
+            by_category.setdefault(category, array('q')).append(article_id)
+            all_ids.append(article_id)
+        with self._lock:
+            self._by_category = by_category
+            self._all = all_ids
+            self._removed = set()
+            self._loaded_at = time.monotonic()
+
+    def add(self, article_id, category):
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._by_category.setdefault(category, array('q')).append(article_id)
+            self._all.append(article_id)
+            self._removed.discard(article_id)
+
+    def remove(self, article_id):
+        with self._lock:
+            # Tombstoned ids are skipped when sampling and dropped on the next reload.
+            self._removed.add(article_id)
+        self.cache.delete(article_id)
+
+    def _sample(self, pool, count, exclude):
+        picked = []
+        if not pool:
+            return picked
+        # A handful of probes is enough: collisions only matter for tiny pools.
+        for _ in range(count * 4):
+            if len(picked) == count:
+                break
+            candidate = pool[random.randrange(len(pool))]
+            if candidate not in exclude and candidate not in picked and candidate not in self._removed:
+                picked.append(candidate)
+        return picked
+
+    # ---------------------------------------------
+    # Public API
+    # ---------------------------------------------
+    def suggest_ids(self, article, same_category=2, limit=3):
+        """Pick up to ``limit`` ids: ``same_category`` from the article's category, the rest from anywhere."""
+        cached = self.cache.get(article.id)
+        if cached is not None:
+            return cached
+        self._ensure_loaded()
+        with self._lock:
+            picked = self._sample(self._by_category.get(article.category), same_category, {article.id})
+            picked += self._sample(self._all, limit - len(picked), {article.id, *picked})
+        self.cache.set(article.id, picked)
+        return picked
+
+    def suggest(self, article, options=(), **kwargs):
+        """Return suggested articles for ``article`` using one primary-key query."""
+        ids = self.suggest_ids(article, **kwargs)
+        if not ids:
+            return []
+        found = {a.id: a for a in self.model.query.options(*options).filter(self.model.id.in_(ids))}
+        return [found[i] for i in ids if i in found]
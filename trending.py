@@ -0,0 +1,227 @@
+# =============================================
+# TRENDING RANKINGS
+# =============================================
+"""Precomputed "trending" and "top this week" rankings of articles.
+
+Ranking by popularity used to mean joining ``Like`` and ``Comment`` on every
+page view.  Instead every article gets one ``article_rank`` row holding two
+scores, each kept current by a single-row UPDATE when something happens to
+the article, so a feed is an index scan that stops after ``k`` rows, either
+globally or within a category.
+
+``hot`` is a time-decayed score kept in log space.  An event of weight ``w``
+at time ``t`` is worth ``w * 2 ** ((t - EPOCH) / half_life)``: instead of
+every old score shrinking as time passes, every new event is worth more, so
+the ordering decays correctly without ever rewriting untouched rows.  Those
+values grow without bound, so the row stores their log and folds new events
+in with ``log(e^hot + e^x)``.
+
+``week`` is the plain engagement weight of the last seven days.  Events add
+to it as they happen; ``refresh()`` recomputes it from the like and comment
+timestamps so old events drop out.  Reads refresh it when it is older than
+``TRENDING_REFRESH_SECONDS`` and ``flask rebuild-trending`` recomputes both
+scores from scratch.
+"""
+import math
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import sqlalchemy as sa
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+WEEK = timedelta(days=7)
+# How ``Article.date`` is written.
+DATE_FORMAT = '%B %d, %Y'
+
+# How much each kind of event counts towards both scores.
+PUBLISH_WEIGHT = 3.0
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 2.0
+
+# A removal that would take ``hot`` to zero (or below) leaves this fraction of it instead.
+_FLOOR = 1e-6
+
+
+class Trending:
+    def __init__(self, app=None, db=None, article_model=None, like_model=None, comment_model=None):
+        self.db = db
+        self.article_model = article_model
+        self.like_model = like_model
+        self.comment_model = comment_model
+        self.table = sa.Table(
+            'article_rank', db.metadata,
+            sa.Column('article_id', sa.Integer, sa.ForeignKey('article.id'), primary_key=True),
+            sa.Column('category', sa.String(50), nullable=False),
+            sa.Column('published_at', sa.DateTime, nullable=False),
+            sa.Column('hot', sa.Float, nullable=False),
+            sa.Column('week', sa.Float, nullable=False, server_default='0'),
+            sa.Index('ix_article_rank_hot', 'hot'),
+            sa.Index('ix_article_rank_category_hot', 'category', 'hot'),
+            sa.Index('ix_article_rank_week', 'week'),
+            sa.Index('ix_article_rank_category_week', 'category', 'week'),
+        )
+        self._refreshed_at = time.monotonic()
+        self._refresh_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('TRENDING_HALF_LIFE_HOURS', float(os.environ.get('TRENDING_HALF_LIFE_HOURS', 24)))
+        app.config.setdefault('TRENDING_REFRESH_SECONDS', 3600)
+        for identifier, listener in (('after_insert', self._article_inserted),
+                                     ('before_delete', self._article_deleted)):
+            if not event.contains(self.article_model, identifier, listener):
+                event.listen(self.article_model, identifier, listener)
+
+    @property
+    def rate(self):
+        return math.log(2) / (current_app.config['TRENDING_HALF_LIFE_HOURS'] * 3600)
+
+    def _log_weight(self, weight, when=None):
+        when = (when or datetime.now(timezone.utc)).replace(tzinfo=timezone.utc)
+        return math.log(weight) + self.rate * (when - EPOCH).total_seconds()
+
+    # ---------------------------------------------
+    # Recording events
+    # ---------------------------------------------
+    def _article_inserted(self, mapper, connection, target):
+        connection.execute(self.table.insert().values(
+            article_id=target.id, category=target.category, published_at=datetime.now(timezone.utc),
+            hot=self._log_weight(PUBLISH_WEIGHT), week=PUBLISH_WEIGHT,
+        ))
+
+    def _article_deleted(self, mapper, connection, target):
+        connection.execute(self.table.delete().where(self.table.c.article_id == target.id))
+
+    def record(self, weights, connection=None):
+        """Fold ``{article_id: weight}`` events into both scores.
+
+        Negative weights take engagement back (an unlike).  Runs on
+        ``connection`` when given, otherwise in the current session's
+        transaction; either way at most two executemany statements.
+        """
+        execute = connection.execute if connection is not None else self.db.session.execute
+        postgres = (connection or self.db.engine).dialect.name == 'postgresql'
+        greatest = sa.func.greatest if postgres else sa.func.max
+        least = sa.func.least if postgres else sa.func.min
+        hot, x = self.table.c.hot, sa.bindparam('x', type_=sa.Float)
+        gains = [self._params(article_id, weight) for article_id, weight in weights.items() if weight > 0]
+        losses = [self._params(article_id, weight) for article_id, weight in weights.items() if weight < 0]
+        if gains:
+            # log(e^hot + e^x), arranged so neither exponential can overflow.
+            execute(self._update(greatest(hot, x) + sa.func.ln(1 + sa.func.exp(-sa.func.abs(hot - x)))), gains)
+        if losses:
+            # log(e^hot - e^x), floored so a score never reaches log(0).
+            execute(self._update(hot + sa.func.ln(greatest(1 - sa.func.exp(least(x - hot, 0)), _FLOOR))), losses)
+
+    def _params(self, article_id, weight):
+        return {'rank_article_id': article_id, 'x': self._log_weight(abs(weight)), 'weight': weight}
+
+    def _update(self, new_hot):
+        return self.table.update()\
+                         .where(self.table.c.article_id == sa.bindparam('rank_article_id'))\
+                         .values(hot=new_hot, week=self.table.c.week + sa.bindparam('weight', type_=sa.Float))
+
+    # ---------------------------------------------
+    # Reading feeds
+    # ---------------------------------------------
+    def ranked(self, query, feed='trending', category=None):
+        """Order an ``Article`` query by one of the feeds ('trending' or 'week')."""
+        if feed == 'week':
+            self._refresh_if_stale()
+        score = self.table.c.hot if feed == 'trending' else self.table.c.week
+        query = query.join(self.table, self.table.c.article_id == self.article_model.id)
+        if category is not None:
+            query = query.filter(self.table.c.category == category)
+        if feed == 'week':
+            query = query.filter(score > 0)
+        return query.order_by(score.desc(), self.table.c.article_id.desc())
+
+    def _refresh_if_stale(self):
+        if time.monotonic() - self._refreshed_at < current_app.config['TRENDING_REFRESH_SECONDS']:
+            return
+        if self._refresh_lock.acquire(blocking=False):
+            try:
+                self.refresh()
+            finally:
+                self._refresh_lock.release()
+
+    # ---------------------------------------------
+    # Recomputing
+    # ---------------------------------------------
+    def _weekly_weight(self, since):
+        Like, Comment = self.like_model, self.comment_model
+        rank = self.table.c
+        likes = sa.select(sa.func.count()).where(Like.article_id == rank.article_id, Like.timestamp >= since)
+        comments = sa.select(sa.func.count()).where(Comment.article_id == rank.article_id,
+                                                    Comment.timestamp >= since)
+        published = sa.case((rank.published_at >= since, PUBLISH_WEIGHT), else_=0.0)
+        return LIKE_WEIGHT * likes.scalar_subquery() + COMMENT_WEIGHT * comments.scalar_subquery() + published
+
+    def refresh(self, everything=False):
+        """Recompute ``week`` so events older than seven days stop counting.
+
+        Only rows that currently count (or were published within the week)
+        can change, unless ``everything`` is set.
+        """
+        since = (datetime.now(timezone.utc) - WEEK).replace(tzinfo=None)
+        statement = self.table.update().values(week=self._weekly_weight(since))
+        if not everything:
+            statement = statement.where(sa.or_(self.table.c.week != 0, self.table.c.published_at >= since))
+        with self.db.engine.begin() as connection:
+            connection.execute(statement)
+        self._refreshed_at = time.monotonic()
+
+    def rebuild(self):
+        """Recompute every row from the articles, likes and comments; returns how many were written."""
+        Article, Like, Comment = self.article_model, self.like_model, self.comment_model
+        weights = {}
+        # Articles only record the day they were published; updated_at moves with every like and comment.
+        rows = [(article_id, category, published_date(date))
+                for article_id, category, date in self.db.session.query(Article.id, Article.category, Article.date)]
+        for article_id, _, published_at in rows:
+            weights[article_id] = [(PUBLISH_WEIGHT, published_at)]
+        for model, weight in ((Like, LIKE_WEIGHT), (Comment, COMMENT_WEIGHT)):
+            for article_id, timestamp in self.db.session.query(model.article_id, model.timestamp):
+                if article_id in weights:
+                    weights[article_id].append((weight, timestamp))
+
+        values = []
+        for article_id, category, published_at in rows:
+            terms = [self._log_weight(weight, when) for weight, when in weights[article_id] if when]
+            hot = max(terms)
+            hot += math.log(sum(math.exp(term - hot) for term in terms))
+            values.append({'article_id': article_id, 'category': category,
+                           'published_at': published_at, 'hot': hot, 'week': 0})
+        with self.db.engine.begin() as connection:
+            connection.execute(self.table.delete())
+            if values:
+                connection.execute(self.table.insert(), values)
+        self.refresh(everything=True)
+        return len(values)
+
+
+def published_date(date):
+    """Midnight of an ``Article.date`` ("January 05, 2026"); unreadable dates count as published at ``EPOCH``."""
+    try:
+        return datetime.strptime(date, DATE_FORMAT)
+    except (TypeError, ValueError):
+        return EPOCH.replace(tzinfo=None)
+
+
+@event.listens_for(Engine, 'connect')
+def _add_sqlite_math(dbapi_connection, connection_record):
+    """Give SQLite builds compiled without math functions the ``ln``/``exp`` the scores need."""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    try:
+        dbapi_connection.execute('SELECT ln(1), exp(0)')
+    except sqlite3.OperationalError:
+        dbapi_connection.create_function('ln', 1, math.log, deterministic=True)
+        dbapi_connection.create_function('exp', 1, math.exp, deterministic=True)
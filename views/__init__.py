@@ -0,0 +1,4 @@
+"""The site's blueprints, one module per area; ``create_app()`` registers them all."""
+from views import articles, auth, categories, discussions, main, profiles, search
+
+BLUEPRINTS = [main.bp, auth.bp, articles.bp, discussions.bp, profiles.bp, search.bp, categories.bp]
@@ -0,0 +1,196 @@
+# =============================================
+# ROUTES - ARTICLES
+# =============================================
+"""Writing, reading, liking and commenting on articles."""
+from flask import (Blueprint, abort, current_app, flash, jsonify, redirect, render_template, request, session,
+                   url_for)
+
+from extensions import category_counts_cache, db, image_processor, page_cache, storage
+from forms import ArticleForm
+from helpers import (article_page_query, article_validators, bump_author_stats, bump_counter, conditional,
+                     get_suggested_articles, not_modified)
+from models import Article, Comment, Like, like_buffer, suggestion_pool, trending
+from query_budget import query_budget
+from storage import InvalidUpload
+from trending import COMMENT_WEIGHT
+
+bp = Blueprint('articles', __name__)
+
+
+@bp.route('/create', methods=['GET', 'POST'])
+def create():
+    if 'user_id' not in session:
+        return redirect(url_for('auth.login'))
+    
+    form = ArticleForm()
+    if form.validate_on_submit():
+        try:
+            image_filename = 'default_article.jpg'
+            if form.image.data:
+                file = form.image.data
+                if file.filename != '':
+                    image_filename = storage.save(file)
+            
+            new_article = Article(
+                title=form.title.data,
+                content=form.content.data,
+                excerpt=form.excerpt.data or form.content.data[:300],
+                category=form.category.data,
+                author_id=session['user_id'],
+                image_url=image_filename
+            )
+            db.session.add(new_article)
+            bump_author_stats(session['user_id'], articles=1)
+            db.session.commit()
+            if image_filename != 'default_article.jpg':
+                image_processor.submit(image_filename)
+            category_counts_cache.clear()
+            suggestion_pool.add(new_article.id, new_article.category)
+            page_cache.invalidate('articles', f'category:{new_article.category}')
+            flash('Article published successfully!', 'success')
+            return redirect(url_for('main.home_after_login'))
+        except InvalidUpload as e:
+            db.session.rollback()
+            flash(str(e), 'danger')
+        except Exception as e:
+            db.session.rollback()
+            flash('Error publishing article. Please try again.', 'danger')
+    return render_template('create.html', form=form)
+
+@bp.route('/article/<int:id>')
+@query_budget(7)
+def article_view(id):
+    if 'user_id' not in session:
+        return redirect(url_for('articles.article_be', id=id))
+    
+    etag, last_modified = article_validators(id, session['user_id'])
+    cache_control = 'private, no-cache'
+    if not_modified(etag, last_modified):
+        return conditional(('', 304), etag, last_modified, cache_control)
+    
+    article = article_page_query().get_or_404(id)
+    liked = like_buffer.liked(session['user_id'], article.id,
+                              Like.query.filter_by(user_id=session['user_id'], article_id=article.id).first() is not None)
+    suggested_articles = get_suggested_articles(article)
+    
+    return conditional(render_template('article.html',
+                                       article=article,
+                                       liked=liked,
+                                       like_count=article.like_count + like_buffer.pending_delta(article.id),
+                                       suggested_articles=suggested_articles,
+                                       current_user_id=session.get('user_id')),
+                       etag, last_modified, cache_control)
+
+@bp.route('/article/<int:article_id>/comment', methods=['POST'])
+def add_comment(article_id):
+    if 'user_id' not in session:
+        return redirect(url_for('auth.login'))
+    
+    comment_text = request.form.get('comment_text')
+    if not comment_text or len(comment_text.strip()) == 0:
+        flash('Comment cannot be empty', 'danger')
+        return redirect(url_for('articles.article_view', id=article_id))
+    
+    try:
+        new_comment = Comment(
+            text=comment_text,
+            author_id=session['user_id'],
+            article_id=article_id
+        )
+        db.session.add(new_comment)
+        bump_counter(Article.comment_count, article_id)
+        bump_author_stats(db.select(Article.author_id).where(Article.id == article_id).scalar_subquery(),
+                          comments=1)
+        trending.record({article_id: COMMENT_WEIGHT})
+        db.session.commit()
+        page_cache.invalidate('trending', f'article:{article_id}')
+        flash('Comment added successfully', 'success')
+    except Exception as e:
+        db.session.rollback()
+        flash('Error adding comment', 'danger')
+    
+    return redirect(url_for('articles.article_view', id=article_id))
+
+@bp.route('/article/<int:id>/like', methods=['POST'])
+@query_budget(6)
+def like_article(id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not logged in'}), 401
+    
+    user_id = session['user_id']
+    existing_like = db.session.query(Like.id).filter_by(user_id=user_id, article_id=id).first() is not None
+    liked = not like_buffer.liked(user_id, id, existing_like)
+    result = like_buffer.set_many(user_id, {id: liked})
+    if id not in result:
+        abort(404)
+    liked, likes = result[id]
+    return jsonify({'likes': likes, 'liked': liked})
+
+@bp.route('/api/likes', methods=['POST'])
+@query_budget(7)
+def set_likes():
+    """Apply a batch of ``{"article_id": ..., "liked": true|false}`` intents.
+
+    Each intent states the end result, so retrying a batch or sending it twice
+    is harmless.  Writes go through ``like_buffer`` and are flushed in bulk.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not logged in'}), 401
+    
+    payload = request.get_json(silent=True) or {}
+    intents = {}
+    try:
+        for item in payload.get('likes', []):
+            intents[int(item['article_id'])] = bool(item['liked'])
+    except (TypeError, KeyError, ValueError, AttributeError):
+        return jsonify({'error': 'Expected {"likes": [{"article_id": ..., "liked": ...}]}'}), 400
+    if not intents or len(intents) > current_app.config['LIKE_BATCH_MAX']:
+        return jsonify({'error': f"Send between 1 and {current_app.config['LIKE_BATCH_MAX']} likes"}), 400
+    
+    result = like_buffer.set_many(session['user_id'], intents)
+    return jsonify({'likes': [{'article_id': article_id, 'liked': liked, 'likes': likes}
+                              for article_id, (liked, likes) in result.items()]})
+
+@bp.route('/delete_article/<int:article_id>', methods=['DELETE'])
+def delete_article(article_id):
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'message': 'Not logged in'}), 401
+    
+    try:
+        article = Article.query.get_or_404(article_id)
+        if article.author_id != session['user_id']:
+            return jsonify({'success': False, 'message': 'Not authorized'}), 403
+        
+        # Delete associated comments and likes
+        Comment.query.filter_by(article_id=article.id).delete()
+        Like.query.filter_by(article_id=article.id).delete()
+        bump_author_stats(article.author_id, articles=-1, likes=-article.like_count,
+                          comments=-article.comment_count)
+        
+        # The image blob is garbage-collected on commit once nothing references it
+        db.session.delete(article)
+        db.session.commit()
+        category_counts_cache.clear()
+        suggestion_pool.remove(article_id)
+        page_cache.invalidate('articles', f'article:{article_id}', f'category:{article.category}')
+        return jsonify({'success': True})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@bp.route('/article_be/<int:id>')
+@query_budget(6)
+@page_cache.cached(tags=lambda id: [f'article:{id}'])
+def article_be(id):
+    etag, last_modified = article_validators(id)
+    cache_control = current_app.config['PAGE_CACHE_CONTROL']
+    if not_modified(etag, last_modified):
+        return conditional(('', 304), etag, last_modified, cache_control)
+    
+    article = article_page_query().get_or_404(id)
+    suggested_articles = get_suggested_articles(article)
+    return conditional(render_template('article_be.html',
+                                       article=article,
+                                       like_count=article.like_count + like_buffer.pending_delta(article.id),
+                                       suggested_articles=suggested_articles),
+                       etag, last_modified, cache_control)
@@ -0,0 +1,66 @@
+# =============================================
+# ROUTES - AUTH
+# =============================================
+"""Signing up, in and out."""
+from flask import Blueprint, flash, redirect, render_template, session, url_for
+
+from extensions import db, image_processor, passwords, storage
+from forms import LoginForm, SignupForm
+from models import User
+
+bp = Blueprint('auth', __name__)
+
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    form = LoginForm()
+    if form.validate_on_submit():
+        user = User.query.filter_by(email=form.email.data).first()
+        matches, new_hash = passwords.verify(user.password, form.password.data) if user else (False, None)
+        if matches:
+            if new_hash:
+                # Stored with an older method or cost: upgrade it now that we have the password.
+                user.password = new_hash
+                db.session.commit()
+            session['user_id'] = user.id
+            session['username'] = user.username
+            flash('Logged in successfully!', 'success')
+            return redirect(url_for('main.home_after_login'))
+        flash('Invalid email or password', 'danger')
+    return render_template('log_in_page.html', form=form)
+
+@bp.route('/signup', methods=['GET', 'POST'])
+def signup():
+    form = SignupForm()
+    if form.validate_on_submit():
+        # Outside the try: a saturated hashing pool answers 503 rather than a flashed error.
+        hashed_pw = passwords.hash(form.password.data)
+        try:
+            profile_pic_filename = 'default.jpg'
+            if form.profile_pic.data:
+                file = form.profile_pic.data
+                if file.filename != '':
+                    profile_pic_filename = storage.save(file)
+            
+            new_user = User(
+                username=form.username.data,
+                email=form.email.data,
+                password=hashed_pw,
+                profile_pic=profile_pic_filename
+            )
+            db.session.add(new_user)
+            db.session.commit()
+            if profile_pic_filename != 'default.jpg':
+                image_processor.submit(profile_pic_filename)
+            session['user_id'] = new_user.id
+            session['username'] = new_user.username
+            return redirect(url_for('main.home_after_login'))
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Error creating account: {str(e)}', 'danger')
+    return render_template('sign_up_page.html', form=form)
+
+@bp.route('/logout')
+def logout():
+    session.clear()
+    return redirect(url_for('main.home'))
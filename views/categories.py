@@ -0,0 +1,53 @@
+# =============================================
+# ROUTES - CATEGORIES
+# =============================================
+"""Per-category article listings."""
+from flask import Blueprint, abort, redirect, render_template, request, session, url_for
+
+from extensions import page_cache
+from helpers import article_listing_query, keyset_page, ranked_articles
+from models import CATEGORY_META
+
+bp = Blueprint('categories', __name__)
+
+
+@bp.route('/category/<category_name>')
+def category_page(category_name):
+    if category_name not in CATEGORY_META:
+        abort(404)
+    
+    if 'user_id' not in session:
+        return redirect(url_for('categories.category_be', category_name=category_name))
+    
+    before = request.args.get('before', type=int)
+    articles, next_cursor = keyset_page(article_listing_query(category=category_name), before)
+    # The ranked strips only head the first page.
+    trending_articles = ranked_articles('trending', category_name, 4) if before is None else []
+    top_week = ranked_articles('week', category_name, 4) if before is None else []
+    
+    return render_template(f'categories/{category_name}.html',
+                         articles=articles,
+                         next_cursor=next_cursor,
+                         trending=trending_articles,
+                         top_week=top_week,
+                         category_name=category_name,
+                         category_color=CATEGORY_META[category_name]['color'],
+                         category_description=CATEGORY_META[category_name]['description'])
+
+@bp.route('/categorybe/<category_name>')
+@page_cache.cached(tags=lambda category_name: [f'category:{category_name}'])
+def category_be(category_name):
+    if category_name not in CATEGORY_META:
+        abort(404)
+    
+    articles, next_cursor = keyset_page(article_listing_query(category=category_name),
+                                        request.args.get('before', type=int))
+    
+    return render_template('search_page_before.html',
+                         articles=articles,
+                         next_cursor=next_cursor,
+                         active_category=category_name,
+                         category_color=CATEGORY_META[category_name]['color'],
+                         category_description=CATEGORY_META[category_name]['description'],
+                         query=None,
+                         page=1)
@@ -0,0 +1,134 @@
+# =============================================
+# ROUTES - DISCUSSIONS
+# =============================================
+"""Discussions and their live message streams."""
+from flask import Blueprint, abort, flash, jsonify, redirect, render_template, request, session, url_for
+
+from extensions import db, image_processor, realtime, search_index, storage
+from forms import DiscussionForm
+from helpers import message_payloads, message_window, messages_after, post_discussion_message
+from models import Discussion
+from query_budget import query_budget
+
+bp = Blueprint('discussions', __name__)
+
+
+@bp.route('/discussions')
+@query_budget(3)
+def discussions():
+    if 'user_id' not in session:
+        return redirect(url_for('auth.login'))
+    
+    query = request.args.get('q', '')
+    page = request.args.get('page', 1, type=int)
+    
+    base_query = Discussion.query
+    if query:
+        base_query = search_index.filter(base_query, Discussion, query)
+    
+    discussions = base_query.order_by(Discussion.created_at.desc()).paginate(page=page, per_page=9)
+    return render_template('discussions_after.html', 
+                         discussions=discussions,
+                         active_tab='discussions',
+                         query=query)
+
+@bp.route('/create_discussion', methods=['GET', 'POST'])
+def create_discussion():
+    if 'user_id' not in session:
+        return redirect(url_for('auth.login'))
+    
+    form = DiscussionForm()
+    if form.validate_on_submit():
+        try:
+            profile_pic_filename = 'default_discussion.jpg'
+            if form.profile_pic.data:
+                file = form.profile_pic.data
+                if file.filename != '':
+                    profile_pic_filename = storage.save(file)
+            
+            new_discussion = Discussion(
+                title=form.title.data,
+                description=form.description.data,
+                profile_pic=profile_pic_filename,
+                author_id=session['user_id']
+            )
+            db.session.add(new_discussion)
+            db.session.commit()
+            if profile_pic_filename != 'default_discussion.jpg':
+                image_processor.submit(profile_pic_filename)
+            flash('Discussion created successfully!', 'success')
+            return redirect(url_for('discussions.discussions'))
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Error creating discussion: {str(e)}', 'danger')
+    
+    return render_template('create_discussion.html', form=form)
+
+@bp.route('/discussion/<int:id>', methods=['GET', 'POST'])
+@query_budget(4)
+def view_discussion(id):
+    if 'user_id' not in session:
+        return redirect(url_for('auth.login'))
+    
+    discussion = Discussion.query.get_or_404(id)
+    
+    if request.method == 'POST':
+        message_text = request.form.get('message_text')
+        if message_text and len(message_text.strip()) > 0:
+            post_discussion_message(discussion.id, session['user_id'], message_text)
+            return redirect(url_for('discussions.view_discussion', id=id))
+    
+    messages, earlier_cursor = message_window(discussion.id)
+    
+    return render_template('discussion_view.html',
+                         discussion=discussion,
+                         messages=messages,
+                         earlier_cursor=earlier_cursor,
+                         last_message_id=max((m.id for m in messages), default=0),
+                         current_user_id=session['user_id'])
+
+@bp.route('/discussion/<int:id>/messages', methods=['GET', 'POST'])
+@query_budget(5)
+def discussion_messages(id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    if not db.session.query(Discussion.query.filter_by(id=id).exists()).scalar():
+        abort(404)
+    
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or request.form
+        text = (data.get('text') or '').strip()
+        if not text:
+            return jsonify({'error': 'Message text is required'}), 400
+        return jsonify(post_discussion_message(id, session['user_id'], text)), 201
+    
+    return jsonify({'messages': messages_after(id, request.args.get('after', 0, type=int))})
+
+@bp.route('/discussion/<int:id>/history')
+@query_budget(2)
+def discussion_history(id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    messages, earlier_cursor = message_window(id, before=request.args.get('before'))
+    if not messages and not db.session.query(Discussion.query.filter_by(id=id).exists()).scalar():
+        abort(404)
+    return jsonify({
+        'messages': message_payloads(messages),
+        'next_cursor': earlier_cursor
+    })
+
+@bp.route('/discussion/<int:id>/events')
+@query_budget(2)
+def discussion_events(id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    if not db.session.query(Discussion.query.filter_by(id=id).exists()).scalar():
+        abort(404)
+    
+    last_id = realtime.last_event_id()
+    if last_id is None:
+        return realtime.stream(f'discussion:{id}', lambda after: [])
+    return realtime.stream(f'discussion:{id}', lambda after: messages_after(id, after), last_id)
@@ -0,0 +1,50 @@
+# =============================================
+# ROUTES - MAIN
+# =============================================
+"""Home pages, static pages and app-wide handlers."""
+from flask import Blueprint, current_app, flash, jsonify, redirect, render_template, request, session, url_for
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from extensions import page_cache
+from helpers import categories_with_counts, latest_articles, ranked_articles
+
+bp = Blueprint('main', __name__)
+
+
+@bp.route('/')
+@page_cache.cached(tags=['articles', 'trending'])
+def home():
+    categories = categories_with_counts()
+    return render_template('index.html', categories=categories,
+                           articles=ranked_articles('trending') or latest_articles(),
+                           top_week=ranked_articles('week'))
+
+@bp.route('/home_after_login')
+def home_after_login():
+    if 'user_id' not in session:
+        return redirect(url_for('auth.login'))
+    
+    categories = categories_with_counts()
+    return render_template('home_after_login.html', categories=categories,
+                           articles=ranked_articles('trending') or latest_articles(),
+                           top_week=ranked_articles('week'))
+
+@bp.route('/about-us')
+@page_cache.cached()
+def about_us():
+    return render_template('about_us.html')
+
+@bp.route('/help')
+@page_cache.cached()
+def help():
+    return render_template('help.html')
+
+@bp.route('/check_auth')
+def check_auth():
+    return jsonify({'authenticated': 'user_id' in session})
+
+@bp.app_errorhandler(RequestEntityTooLarge)
+def upload_too_large(error):
+    limit_mb = current_app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)
+    flash(f'Upload too large: files must be smaller than {limit_mb} MB.', 'danger')
+    return redirect(request.url)
@@ -0,0 +1,86 @@
+# =============================================
+# ROUTES - PROFILES
+# =============================================
+"""User profiles."""
+from flask import Blueprint, flash, redirect, render_template, request, session, url_for
+from sqlalchemy.orm import joinedload
+
+from extensions import db, image_processor, storage
+from helpers import allowed_file, keyset_page
+from models import CATEGORY_META, Article, User, author_cache
+from query_budget import query_budget
+
+bp = Blueprint('profiles', __name__)
+
+
+@bp.route('/profile')
+@query_budget(2)
+def profile():
+    if 'user_id' not in session:
+        return redirect(url_for('auth.login'))
+    
+    user = User.query.options(joinedload(User.stats)).get(session['user_id'])
+    articles, next_cursor = keyset_page(Article.query.filter_by(author_id=user.id),
+                                        request.args.get('before', type=int))
+    
+    return render_template('profile.html', 
+                         user=user,
+                         articles=articles,
+                         next_cursor=next_cursor,
+                         stats=user.stats)
+
+@bp.route('/profile/<username>')
+@query_budget(2)
+def view_profile(username):
+    if 'user_id' not in session:
+        return redirect(url_for('auth.login'))
+    
+    user = User.query.options(joinedload(User.stats)).filter_by(username=username).first_or_404()
+    articles, next_cursor = keyset_page(Article.query.filter_by(author_id=user.id),
+                                        request.args.get('before', type=int))
+    
+    return render_template('view_profile.html',
+                         user=user,
+                         articles=articles,
+                         next_cursor=next_cursor,
+                         stats=user.stats,
+                         category_colors={name: meta['color'] for name, meta in CATEGORY_META.items()},
+                         current_user_id=session.get('user_id'))
+
+@bp.route('/update_profile', methods=['POST'])
+def update_profile():
+    if 'user_id' not in session:
+        return redirect(url_for('auth.login'))
+    
+    user = User.query.get(session['user_id'])
+    new_profile_pic = None
+    try:
+        new_username = request.form.get('username')
+        if new_username and new_username != user.username:
+            existing_user = User.query.filter_by(username=new_username).first()
+            if existing_user and existing_user.id != user.id:
+                flash('Username already taken', 'danger')
+                return redirect(url_for('profiles.profile'))
+            user.username = new_username
+        
+        if 'profile_pic' in request.files:
+            file = request.files['profile_pic']
+            if file.filename != '' and allowed_file(file.filename):
+                # The old picture is garbage-collected on commit if nobody else uses it
+                profile_pic = storage.save(file)
+                if profile_pic != user.profile_pic:
+                    user.profile_pic = profile_pic
+                    user.profile_pic_variants = None
+                    new_profile_pic = profile_pic
+        
+        db.session.commit()
+        if new_profile_pic:
+            image_processor.submit(new_profile_pic)
+        author_cache.invalidate(user.id)
+        session['username'] = user.username
+        flash('Profile updated successfully!', 'success')
+    except Exception as e:
+        db.session.rollback()
+        flash('Error updating profile: ' + str(e), 'danger')
+    
+    return redirect(url_for('profiles.profile'))
@@ -0,0 +1,116 @@
+# =============================================
+# ROUTES - SEARCH
+# =============================================
+"""Article and profile search, and the infinite-scroll article API."""
+from flask import Blueprint, jsonify, redirect, render_template, request, session, url_for
+from sqlalchemy.sql import func
+
+from extensions import db, page_cache, search_index
+from helpers import article_listing_query, keyset_page
+from images import upload_url
+from models import Article, User
+from query_budget import query_budget
+
+bp = Blueprint('search', __name__)
+
+
+@bp.route('/search')
+@query_budget(3)
+def search():
+    if 'user_id' not in session:
+        return redirect(url_for('search.search_be'))
+    
+    query = request.args.get('q', '')
+    category = request.args.get('category', '')
+    page = request.args.get('page', 1, type=int)
+    active_tab = 'articles'
+    
+    base_query = Article.query
+    if category:
+        base_query = base_query.filter_by(category=category)
+    if query:
+        base_query = search_index.filter(base_query, Article, query)
+    
+    results = base_query.order_by(Article.id.desc()).paginate(page=page, per_page=9)
+    snippets = search_index.snippets(Article, [a.id for a in results.items], query, 'content') if query else {}
+    return render_template('search_page.html',
+                         query=query,
+                         results=results,
+                         snippets=snippets,
+                         active_category=category,
+                         active_tab=active_tab,
+                         page=page)
+
+@bp.route('/searchbe', methods=['GET', 'POST'])
+@query_budget(2)
+@page_cache.cached(tags=['articles'])
+def search_be():
+    if request.method == 'POST':
+        query = request.form.get('q', '')
+        return redirect(url_for('search.search_be', q=query))
+    
+    query = request.args.get('q', '')
+    category = request.args.get('category', '')
+    before = request.args.get('before', type=int)
+    
+    articles, next_cursor = keyset_page(article_listing_query(query, category), before)
+    snippets = search_index.snippets(Article, [a.id for a in articles], query, 'content') if query else {}
+    return render_template('search_page_before.html',
+                         articles=articles,
+                         snippets=snippets,
+                         next_cursor=next_cursor,
+                         query=query,
+                         active_category=category)
+
+@bp.route('/api/articles')
+@page_cache.cached(tags=['articles'])
+def load_more_articles():
+    query = request.args.get('q', '')
+    category = request.args.get('category', '')
+    before = request.args.get('before', type=int)
+    
+    articles, next_cursor = keyset_page(article_listing_query(query, category), before)
+    snippets = search_index.snippets(Article, [a.id for a in articles], query, 'content') if query else {}
+    view = 'articles.article_view' if 'user_id' in session else 'articles.article_be'
+    return jsonify({
+        'articles': [{
+            'id': article.id,
+            'title': article.title,
+            'category': article.category,
+            'date': article.date,
+            'excerpt': article.excerpt,
+            'snippet': str(snippets[article.id]) if article.id in snippets else None,
+            'image': upload_url(article.image_url, article.image_variants, 640)
+                     if article.image_url != 'default_article.jpg'
+                     else url_for('static', filename='images/default_article.jpg'),
+            'url': url_for(view, id=article.id)
+        } for article in articles],
+        'next_cursor': next_cursor
+    })
+
+@bp.route('/search/profiles')
+@query_budget(4)
+def search_profiles():
+    if 'user_id' not in session:
+        return redirect(url_for('auth.login'))
+    
+    query = request.args.get('q', '')
+    page = request.args.get('page', 1, type=int)
+    
+    base_query = User.query
+    if query:
+        base_query = search_index.filter(base_query, User, query)
+    
+    users = base_query.order_by(User.username.asc()).paginate(page=page, per_page=9)
+    article_counts = dict(
+        db.session.query(Article.author_id, func.count(Article.id))
+                  .filter(Article.author_id.in_([user.id for user in users.items]))
+                  .group_by(Article.author_id)
+                  .all()
+    ) if users.items else {}
+    return render_template('search_profiles.html',
+                         query=query,
+                         users=users,
+                         article_counts=article_counts,
+                         active_tab='profiles',
+                         page=page)